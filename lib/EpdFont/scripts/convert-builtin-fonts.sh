@@ -4,6 +4,29 @@ set -e
 
 cd "$(dirname "$0")"
 
+# Each font is converted by its own fontconvert.py process; run up to JOBS of
+# them at a time (defaults to the number of CPUs).
+JOBS=${JOBS:-$(nproc 2>/dev/null || sysctl -n hw.ncpu 2>/dev/null || echo 4)}
+pids=()
+failed=0
+
+wait_for_jobs() {
+  for pid in "${pids[@]}"; do
+    wait "$pid" || failed=1
+  done
+  pids=()
+}
+
+convert_font() {
+  local output_path=$1
+  shift
+  (python fontconvert.py "$@" > "$output_path" && echo "Generated $output_path") &
+  pids+=($!)
+  if [ ${#pids[@]} -ge "$JOBS" ]; then
+    wait_for_jobs
+  fi
+}
+
 READER_FONT_STYLES=("Regular" "Italic" "Bold" "BoldItalic")
 BOOKERLY_FONT_SIZES=(12 14 16 18)
 NOTOSANS_FONT_SIZES=(12 14 16 18)
@@ -14,8 +37,7 @@ for size in ${BOOKERLY_FONT_SIZES[@]}; do
     font_name="bookerly_${size}_$(echo $style | tr '[:upper:]' '[:lower:]')"
     font_path="../builtinFonts/source/Bookerly/Bookerly-${style}.ttf"
     output_path="../builtinFonts/${font_name}.h"
-    python fontconvert.py $font_name $size $font_path --2bit --compress > $output_path
-    echo "Generated $output_path"
+    convert_font $output_path $font_name $size $font_path --2bit --compress
   done
 done
 
@@ -24,8 +46,7 @@ for size in ${NOTOSANS_FONT_SIZES[@]}; do
     font_name="notosans_${size}_$(echo $style | tr '[:upper:]' '[:lower:]')"
     font_path="../builtinFonts/source/NotoSans/NotoSans-${style}.ttf"
     output_path="../builtinFonts/${font_name}.h"
-    python fontconvert.py $font_name $size $font_path --2bit --compress > $output_path
-    echo "Generated $output_path"
+    convert_font $output_path $font_name $size $font_path --2bit --compress
   done
 done
 
@@ -34,8 +55,7 @@ for size in ${OPENDYSLEXIC_FONT_SIZES[@]}; do
     font_name="opendyslexic_${size}_$(echo $style | tr '[:upper:]' '[:lower:]')"
     font_path="../builtinFonts/source/OpenDyslexic/OpenDyslexic-${style}.otf"
     output_path="../builtinFonts/${font_name}.h"
-    python fontconvert.py $font_name $size $font_path --2bit --compress > $output_path
-    echo "Generated $output_path"
+    convert_font $output_path $font_name $size $font_path --2bit --compress
   done
 done
 
@@ -47,12 +67,17 @@ for size in ${UI_FONT_SIZES[@]}; do
     font_name="ubuntu_${size}_$(echo $style | tr '[:upper:]' '[:lower:]')"
     font_path="../builtinFonts/source/Ubuntu/Ubuntu-${style}.ttf"
     output_path="../builtinFonts/${font_name}.h"
-    python fontconvert.py $font_name $size $font_path > $output_path
-    echo "Generated $output_path"
+    convert_font $output_path $font_name $size $font_path
   done
 done
 
-python fontconvert.py notosans_8_regular 8 ../builtinFonts/source/NotoSans/NotoSans-Regular.ttf > ../builtinFonts/notosans_8_regular.h
+convert_font ../builtinFonts/notosans_8_regular.h notosans_8_regular 8 ../builtinFonts/source/NotoSans/NotoSans-Regular.ttf
+
+wait_for_jobs
+if [ $failed -ne 0 ]; then
+  echo "Font conversion failed" >&2
+  exit 1
+fi
 
 echo ""
 echo "Running compression verification..."
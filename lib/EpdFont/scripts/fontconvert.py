@@ -1,11 +1,17 @@
 #!python3
 import freetype
 import zlib
+import ctypes
+import io
 import sys
-import re
-import math
+import os
+import pickle
+import hashlib
 import argparse
-from collections import namedtuple
+import tempfile
+import numpy as np
+from array import array
+from collections import defaultdict, namedtuple
 from fontTools.ttLib import TTFont
 
 # Originally from https://github.com/vroland/epdiy
@@ -17,8 +23,15 @@ parser.add_argument("fontstack", action="store", nargs='+', help="list of font f
 parser.add_argument("--2bit", dest="is2Bit", action="store_true", help="generate 2-bit greyscale bitmap instead of 1-bit black and white.")
 parser.add_argument("--additional-intervals", dest="additional_intervals", action="append", help="Additional code point intervals to export as min,max. This argument can be repeated.")
 parser.add_argument("--compress", dest="compress", action="store_true", help="Compress glyph bitmaps using DEFLATE with group-based compression.")
+parser.add_argument("--deflate-search", dest="deflate_search", action="store_true", help="With --compress, try every zlib strategy per group and keep the smallest stream. Still raw DEFLATE, but the output differs from the default.")
 parser.add_argument("--force-autohint", dest="force_autohint", action="store_true", help="Force FreeType auto-hinter instead of native font hinting. Improves stem width consistency for fonts with weak or no native TrueType hints.")
+parser.add_argument("--dedup-bitmaps", dest="dedup_bitmaps", action="store_true", help="Store identical glyph bitmaps once and point every glyph using them at the same data. Not supported with --compress.")
+parser.add_argument("--crop-bitmaps", dest="crop_bitmaps", action="store_true", help="Trim glyph bitmap edges that are blank at the output bit depth, adjusting left/top to match.")
+parser.add_argument("--binary-bitmaps", dest="binary_bitmaps", metavar="FILE", help="Write the bitmap data to FILE and have the header pull it in with an assembler .incbin instead of emitting a hex array. The header names FILE relative to the project root, where PlatformIO runs the compiler.")
+parser.add_argument("--cache-dir", dest="cache_dir", help="Directory for caching fonttools kerning and ligature extraction between runs. Entries are keyed on font file contents.")
 args = parser.parse_args()
+if args.dedup_bitmaps and args.compress:
+    parser.error("--dedup-bitmaps cannot be combined with --compress (compressed groups need contiguous glyph data)")
 
 GlyphProps = namedtuple("GlyphProps", ["width", "height", "advance_x", "left", "top", "data_length", "data_offset", "code_point"])
 
@@ -131,11 +144,12 @@ add_ints = []
 if args.additional_intervals:
     add_ints = [tuple([int(n, base=0) for n in i.split(",")]) for i in args.additional_intervals]
 
+# FreeType 26.6 metrics are ints; >> floors for negative values too
 def norm_floor(val):
-    return int(math.floor(val / (1 << 6)))
+    return val >> 6
 
 def norm_ceil(val):
-    return int(math.ceil(val / (1 << 6)))
+    return -(-val >> 6)
 
 # Fixed-point (fp4) output conventions (must match EpdFontData.h / fp4 namespace):
 #
@@ -168,16 +182,81 @@ def chunks(l, n):
     for i in range(0, len(l), n):
         yield l[i:i + n]
 
+# code point -> (font stack index, glyph index), or None if no face has it.
+# Filled lazily so each code point walks the font stack only once.
+cp_resolution = {}
+
+# Bound per-face methods, so the hot lookups skip the attribute resolution
+face_char_index = [face.get_char_index for face in font_stack]
+face_load_glyph = [face.load_glyph for face in font_stack]
+
+def resolve_glyph(code_point):
+    if code_point not in cp_resolution:
+        resolved = None
+        for face_index, get_char_index in enumerate(face_char_index):
+            glyph_index = get_char_index(code_point)
+            if glyph_index > 0:
+                resolved = (face_index, glyph_index)
+                break
+        cp_resolution[code_point] = resolved
+    return cp_resolution[code_point]
+
 def load_glyph(code_point):
-    face_index = 0
-    while face_index < len(font_stack):
-        face = font_stack[face_index]
-        glyph_index = face.get_char_index(code_point)
-        if glyph_index > 0:
-            face.load_glyph(glyph_index, load_flags)
-            return face
-        face_index += 1
-    return None
+    resolved = resolve_glyph(code_point)
+    if resolved is None:
+        return None
+    face_index, glyph_index = resolved
+    face_load_glyph[face_index](glyph_index, load_flags)
+    return font_stack[face_index]
+
+def grey_pixels(bitmap):
+    """Copy FreeType's 8-bit coverage buffer into a (rows, width) array.
+
+    freetype-py's Bitmap.buffer builds a Python list one pixel at a time, so
+    the bytes are read straight from the underlying FT_Bitmap instead.
+    """
+    size = bitmap.rows * bitmap.pitch
+    data = ctypes.string_at(bitmap._FT_Bitmap.buffer, size) if size else b''
+    return np.frombuffer(data, dtype=np.uint8).reshape(bitmap.rows, bitmap.pitch)[:, :bitmap.width]
+
+# Both depths are cut on the 4-bit greyscale level (coverage >> 4).
+# 2-bit: 0-3 white, 4-7 light grey, 8-11 dark grey, 12-15 black, which is
+# just the top two bits of coverage.
+# 1-bit: treat any 2+ as black, i.e. coverage of 32 and up.
+BLACK_THRESHOLD = 2 << 4
+
+def pack_2bit(levels):
+    """Pack a flat array of 2-bit levels 4 per byte, MSB first, zero-padding the tail."""
+    levels = np.pad(levels, (0, -len(levels) % 4)).reshape(-1, 4)
+    return (levels[:, 0] << 6) | (levels[:, 1] << 4) | (levels[:, 2] << 2) | levels[:, 3]
+
+def unpack_2bit(packed):
+    """Inverse of pack_2bit(): one 2-bit level per array element, padding included."""
+    packed = np.frombuffer(packed, dtype=np.uint8)
+    return np.stack([packed >> 6, (packed >> 4) & 3, (packed >> 2) & 3, packed & 3], axis=-1).reshape(-1)
+
+def downsample_2bit(grey):
+    """Quantize a grey_pixels() array to a packed 2-bit bitmap, 4 pixels per byte, MSB first."""
+    return pack_2bit(grey.reshape(-1) >> 6)
+
+def downsample_1bit(grey):
+    """Threshold a grey_pixels() array to a packed 1-bit bitmap, 8 pixels per byte, MSB first."""
+    return np.packbits(grey.reshape(-1) >= BLACK_THRESHOLD)
+
+def crop_blank_edges(grey, left, top):
+    """Trim edge rows and columns of a grey_pixels() array that quantize to white.
+
+    Returns the cropped array with bitmap left/top adjusted to match. Glyphs
+    with no visible pixels at all are returned unchanged.
+    """
+    ink = grey >= (1 << 6 if is2Bit else BLACK_THRESHOLD)
+    ink_rows = np.flatnonzero(ink.any(axis=1))
+    if not len(ink_rows):
+        return grey, left, top
+    ink_cols = np.flatnonzero(ink.any(axis=0))
+    y0, y1 = int(ink_rows[0]), int(ink_rows[-1]) + 1
+    x0, x1 = int(ink_cols[0]), int(ink_cols[-1]) + 1
+    return grey[y0:y1, x0:x1], left + x0, top - y0
 
 unmerged_intervals = sorted(intervals + add_ints)
 intervals = []
@@ -188,70 +267,33 @@ for i_start, i_end in unmerged_intervals:
         continue
     unvalidated_intervals.append((i_start, i_end))
 
-for i_start, i_end in unvalidated_intervals:
-    start = i_start
-    for code_point in range(i_start, i_end + 1):
-        face = load_glyph(code_point)
-        if face is None:
-            if start < code_point:
-                intervals.append((start, code_point - 1))
-            start = code_point + 1
-    if start != i_end + 1:
-        intervals.append((start, i_end))
-
 for face in font_stack:
     face.set_char_size(size << 6, size << 6, 150, 150)
 
 total_size = 0
 all_glyphs = []
 
-for i_start, i_end in intervals:
+# Validate and rasterize in a single walk: code points no face covers split
+# their interval, and each run of covered code points is an output interval.
+for i_start, i_end in unvalidated_intervals:
+    start = i_start
     for code_point in range(i_start, i_end + 1):
         face = load_glyph(code_point)
+        if face is None:
+            if start < code_point:
+                intervals.append((start, code_point - 1))
+            start = code_point + 1
+            continue
         bitmap = face.glyph.bitmap
 
-        # Build out 4-bit greyscale bitmap
-        pixels4g = []
-        px = 0
-        for i, v in enumerate(bitmap.buffer):
-            y = i / bitmap.width
-            x = i % bitmap.width
-            if x % 2 == 0:
-                px = (v >> 4)
-            else:
-                px = px | (v & 0xF0)
-                pixels4g.append(px);
-                px = 0
-            # eol
-            if x == bitmap.width - 1 and bitmap.width % 2 > 0:
-                pixels4g.append(px)
-                px = 0
+        grey = grey_pixels(bitmap)
+        left = face.glyph.bitmap_left
+        top = face.glyph.bitmap_top
+        if args.crop_bitmaps:
+            grey, left, top = crop_blank_edges(grey, left, top)
 
         if is2Bit:
-            # 0-3 white, 4-7 light grey, 8-11 dark grey, 12-15 black
-            # Downsample to 2-bit bitmap
-            pixels2b = []
-            px = 0
-            pitch = (bitmap.width // 2) + (bitmap.width % 2)
-            for y in range(bitmap.rows):
-                for x in range(bitmap.width):
-                    px = px << 2
-                    bm = pixels4g[y * pitch + (x // 2)]
-                    bm = (bm >> ((x % 2) * 4)) & 0xF
-
-                    if bm >= 12:
-                        px += 3
-                    elif bm >= 8:
-                        px += 2
-                    elif bm >= 4:
-                        px += 1
-
-                    if (y * bitmap.width + x) % 4 == 3:
-                        pixels2b.append(px)
-                        px = 0
-            if (bitmap.width * bitmap.rows) % 4 != 0:
-                px = px << (4 - (bitmap.width * bitmap.rows) % 4) * 2
-                pixels2b.append(px)
+            pixels2b = downsample_2bit(grey)
 
             # for y in range(bitmap.rows):
             #     line = ''
@@ -263,22 +305,7 @@ for i_start, i_end in intervals:
             #     print(line)
             # print('')
         else:
-            # Downsample to 1-bit bitmap - treat any 2+ as black
-            pixelsbw = []
-            px = 0
-            pitch = (bitmap.width // 2) + (bitmap.width % 2)
-            for y in range(bitmap.rows):
-                for x in range(bitmap.width):
-                    px = px << 1
-                    bm = pixels4g[y * pitch + (x // 2)]
-                    px += 1 if ((x & 1) == 0 and bm & 0xE > 0) or ((x & 1) == 1 and bm & 0xE0 > 0) else 0
-
-                    if (y * bitmap.width + x) % 8 == 7:
-                        pixelsbw.append(px)
-                        px = 0
-            if (bitmap.width * bitmap.rows) % 8 != 0:
-                px = px << (8 - (bitmap.width * bitmap.rows) % 8)
-                pixelsbw.append(px)
+            pixelsbw = downsample_1bit(grey)
 
             # for y in range(bitmap.rows):
             #     line = ''
@@ -293,32 +320,46 @@ for i_start, i_end in intervals:
         pixels = pixels2b if is2Bit else pixelsbw
 
         # Build output data
-        packed = bytes(pixels)
+        packed = pixels.tobytes()
         glyph = GlyphProps(
-            width = bitmap.width,
-            height = bitmap.rows,
+            width = grey.shape[1],
+            height = grey.shape[0],
             # We use linearHoriAdvance (16.16 fixed-point, unhinted) instead of
             # advance.x (26.6 fixed-point, grid-fitted to whole pixels by hinter)
             advance_x = fp4_from_ft16_16(face.glyph.linearHoriAdvance),
-            left = face.glyph.bitmap_left,
-            top = face.glyph.bitmap_top,
+            left = left,
+            top = top,
             data_length = len(packed),
             data_offset = total_size,
             code_point = code_point,
         )
         total_size += len(packed)
         all_glyphs.append((glyph, packed))
+    if start != i_end + 1:
+        intervals.append((start, i_end))
 
-# pipe seems to be a good heuristic for the "real" descender
-face = load_glyph(ord('|'))
+# pipe seems to be a good heuristic for the "real" descender; only the size
+# metrics of the face that has it are used, so the glyph is not loaded
+face = font_stack[resolve_glyph(ord('|'))[0]]
 
-glyph_data = []
+glyph_data = bytearray()
 glyph_props = []
-for index, glyph in enumerate(all_glyphs):
-    props, packed = glyph
-    glyph_data.extend([b for b in packed])
+bitmap_offsets = {}  # packed bitmap -> offset into glyph_data, for --dedup-bitmaps
+for props, packed in all_glyphs:
+    if args.dedup_bitmaps:
+        offset = bitmap_offsets.get(packed)
+        if offset is None:
+            offset = bitmap_offsets[packed] = len(glyph_data)
+            glyph_data += packed
+        props = props._replace(data_offset=offset)
+    else:
+        glyph_data += packed
     glyph_props.append(props)
 
+if args.dedup_bitmaps:
+    print(f"// Dedup: {total_size} -> {len(glyph_data)} bytes, "
+          f"{len(all_glyphs) - len(bitmap_offsets)} glyphs share a bitmap", file=sys.stderr)
+
 # --- Kerning pair extraction ---
 # Modern fonts store kerning in the OpenType GPOS table, which FreeType's
 # get_kerning() does not read. We use fonttools to parse both the legacy
@@ -331,22 +372,24 @@ all_codepoints = [g.code_point for g in glyph_props]
 kernable_codepoints = set(cp for cp in all_codepoints
                           if not (COMBINING_MARKS_START <= cp <= COMBINING_MARKS_END))
 
-# Map each kernable codepoint to the font-stack index that serves it
-# (same priority logic as load_glyph).
-cp_to_face_idx = {}
+# Group kernable codepoints by the font-stack index that serves them
+# (same priority logic as load_glyph). Ligature extraction below uses the
+# same codepoint set, so it shares this grouping.
+face_idx_cps = {}
 for cp in kernable_codepoints:
-    for face_idx, f in enumerate(font_stack):
-        if f.get_char_index(cp) > 0:
-            cp_to_face_idx[cp] = face_idx
-            break
+    face_idx_cps.setdefault(cp_resolution[cp][0], set()).add(cp)
 
-# Group codepoints by face index
-face_idx_cps = {}
-for cp, fi in cp_to_face_idx.items():
-    face_idx_cps.setdefault(fi, set()).add(cp)
+# ValueRecord format flag for XAdvance (OpenType GPOS ValueFormat)
+VALUE_FORMAT_X_ADVANCE = 0x0004
 
 def _extract_pairpos_subtable(subtable, glyph_to_cp, raw_kern):
     """Extract kerning from a PairPos subtable (Format 1 or 2)."""
+    # Only the first glyph's XAdvance is used. ValueFormat1 applies to every
+    # record in the subtable, so check it once and then read XAdvance
+    # directly instead of probing each record's attributes. Subtables of
+    # other lookup types in the 'kern' feature have no ValueFormat1.
+    if not getattr(subtable, 'ValueFormat1', 0) & VALUE_FORMAT_X_ADVANCE:
+        return
     if subtable.Format == 1:
         # Individual pairs
         for i, coverage_glyph in enumerate(subtable.Coverage.glyphs):
@@ -356,44 +399,47 @@ def _extract_pairpos_subtable(subtable, glyph_to_cp, raw_kern):
             for pvr in pair_set.PairValueRecord:
                 if pvr.SecondGlyph not in glyph_to_cp:
                     continue
-                xa = 0
-                if hasattr(pvr, 'Value1') and pvr.Value1:
-                    xa = getattr(pvr.Value1, 'XAdvance', 0) or 0
+                xa = pvr.Value1.XAdvance
                 if xa != 0:
-                    key = (coverage_glyph, pvr.SecondGlyph)
-                    raw_kern[key] = raw_kern.get(key, 0) + xa
+                    raw_kern[(coverage_glyph, pvr.SecondGlyph)] += xa
     elif subtable.Format == 2:
-        # Class-based pairs
+        # Class-based pairs. Tabulate the XAdvance of just the class pairs our
+        # glyphs fall into, gather it for every (left, right) glyph pair in one
+        # array lookup, and expand only the non-zero entries. Classes out of
+        # range for the subtable keep an all-zero row/column.
         class_def1 = subtable.ClassDef1.classDefs if subtable.ClassDef1 else {}
         class_def2 = subtable.ClassDef2.classDefs if subtable.ClassDef2 else {}
         coverage_set = set(subtable.Coverage.glyphs)
-        for left_glyph in glyph_to_cp:
-            if left_glyph not in coverage_set:
-                continue
-            c1 = class_def1.get(left_glyph, 0)
+        left_glyphs = [glyph for glyph in glyph_to_cp if glyph in coverage_set]
+        right_glyphs = list(glyph_to_cp)
+        left_classes = np.array([class_def1.get(glyph, 0) for glyph in left_glyphs], dtype=np.intp)
+        right_classes = np.array([class_def2.get(glyph, 0) for glyph in right_glyphs], dtype=np.intp)
+        if not len(left_classes) or not len(right_classes):
+            return
+
+        xa_matrix = np.zeros((left_classes.max() + 1, right_classes.max() + 1), dtype=np.int32)
+        used_class2 = np.unique(right_classes).tolist()
+        for c1 in np.unique(left_classes).tolist():
             if c1 >= len(subtable.Class1Record):
                 continue
             class1_rec = subtable.Class1Record[c1]
-            for right_glyph in glyph_to_cp:
-                c2 = class_def2.get(right_glyph, 0)
+            for c2 in used_class2:
                 if c2 >= len(class1_rec.Class2Record):
                     continue
-                c2_rec = class1_rec.Class2Record[c2]
-                xa = 0
-                if hasattr(c2_rec, 'Value1') and c2_rec.Value1:
-                    xa = getattr(c2_rec.Value1, 'XAdvance', 0) or 0
-                if xa != 0:
-                    key = (left_glyph, right_glyph)
-                    raw_kern[key] = raw_kern.get(key, 0) + xa
+                xa_matrix[c1, c2] = class1_rec.Class2Record[c2].Value1.XAdvance
+
+        pair_xa = xa_matrix[np.ix_(left_classes, right_classes)]
+        left_idx, right_idx = np.nonzero(pair_xa)
+        for li, ri, xa in zip(left_idx.tolist(), right_idx.tolist(), pair_xa[left_idx, right_idx].tolist()):
+            raw_kern[(left_glyphs[li], right_glyphs[ri])] += xa
 
-def extract_kerning_fonttools(font_path, codepoints, ppem):
-    """Extract kerning pairs from a font file using fonttools.
+def extract_kerning_fonttools(font, codepoints):
+    """Extract kerning pairs from a parsed fonttools TTFont.
 
-    Returns dict of {(leftCp, rightCp): pixel_adjust} for the given
-    codepoints.  Values are scaled from font design units to integer
-    pixels at ppem.
+    Returns (units_per_em, {(leftCp, rightCp): design_units}) for the given
+    codepoints. Values are left in font design units so the result does not
+    depend on the output size; see scale_kerning().
     """
-    font = TTFont(font_path)
     units_per_em = font['head'].unitsPerEm
     cmap = font.getBestCmap() or {}
 
@@ -405,7 +451,7 @@ def extract_kerning_fonttools(font_path, codepoints, ppem):
             glyph_to_cp[gname] = cp
 
     # Collect raw kerning values in font design units
-    raw_kern = {}  # (left_glyph_name, right_glyph_name) -> design_units
+    raw_kern = defaultdict(int)  # (left_glyph_name, right_glyph_name) -> design_units
 
     # 1. Legacy kern table
     if 'kern' in font:
@@ -413,7 +459,7 @@ def extract_kerning_fonttools(font_path, codepoints, ppem):
             if hasattr(subtable, 'kernTable'):
                 for (lg, rg), val in subtable.kernTable.items():
                     if lg in glyph_to_cp and rg in glyph_to_cp:
-                        raw_kern[(lg, rg)] = raw_kern.get((lg, rg), 0) + val
+                        raw_kern[(lg, rg)] += val
 
     # 2. GPOS 'kern' feature
     if 'GPOS' in font:
@@ -433,17 +479,65 @@ def extract_kerning_fonttools(font_path, codepoints, ppem):
                 if hasattr(actual, 'Format'):
                     _extract_pairpos_subtable(actual, glyph_to_cp, raw_kern)
 
-    font.close()
+    cp_kern = {(glyph_to_cp[lg], glyph_to_cp[rg]): du for (lg, rg), du in raw_kern.items()}
+    return units_per_em, cp_kern
 
-    # Scale design-unit kerning values to 4.4 fixed-point pixels.
+def scale_kerning(cp_kern, units_per_em, ppem):
+    """Scale design-unit kerning values to 4.4 fixed-point pixels at ppem.
+
+    Returns dict of {(leftCp, rightCp): adjust}, dropping pairs that round
+    to zero.
+    """
     scale = ppem / units_per_em
     result = {}  # (leftCp, rightCp) -> 4.4 fixed-point adjust
-    for (lg, rg), du in raw_kern.items():
-        lcp = glyph_to_cp[lg]
-        rcp = glyph_to_cp[rg]
+    for pair, du in cp_kern.items():
         adjust = fp4_from_design_units(du, scale)
         if adjust != 0:
-            result[(lcp, rcp)] = adjust
+            result[pair] = adjust
+    return result
+
+# Bump when the extraction logic changes to invalidate --cache-dir entries
+CACHE_VERSION = 1
+
+font_file_digests = {}  # face_idx -> sha256 of the font file, hashed once per run
+
+def font_file_digest(face_idx):
+    if face_idx not in font_file_digests:
+        with open(args.fontstack[face_idx], 'rb') as f:
+            font_file_digests[face_idx] = hashlib.sha256(f.read()).digest()
+    return font_file_digests[face_idx]
+
+def cached_extraction(kind, face_idx, codepoints, extract):
+    """Return extract(), memoized as a pickle under --cache-dir if given.
+
+    Entries are keyed on the font file's contents and the requested
+    codepoints, so replacing a font or changing intervals misses the cache.
+    Nothing here depends on the output size, so every size of a font
+    shares its entries.
+    """
+    if not args.cache_dir:
+        return extract()
+    key = hashlib.sha256(font_file_digest(face_idx))
+    key.update(repr((CACHE_VERSION, kind, sorted(codepoints), sorted(all_codepoints))).encode())
+    cache_path = os.path.join(args.cache_dir, f"{kind}-{key.hexdigest()}.pickle")
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+    result = extract()
+    os.makedirs(args.cache_dir, exist_ok=True)
+    # Parallel conversions of the same font share entries, so write to a
+    # temporary file and rename it into place; readers never see a partial
+    # pickle.
+    with tempfile.NamedTemporaryFile(dir=args.cache_dir, suffix='.tmp', delete=False) as f:
+        try:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, cache_path)
     return result
 
 # The ppem used by the existing glyph rasterization:
@@ -451,67 +545,95 @@ def extract_kerning_fonttools(font_path, codepoints, ppem):
 # means size_pt at 150 DPI -> ppem = size * 150 / 72
 ppem = size * 150.0 / 72.0
 
+def open_tt_font(path):
+    """Parse a font file with fonttools from an in-memory copy of it.
+
+    lazy=True defers decompiling individual GPOS/GSUB lookups until they are
+    read, so only the 'kern', 'liga' and 'rlig' lookups are ever parsed. On
+    its own it would also keep the font file open for the whole run and read
+    it on demand; reading from a private buffer leaves no file handle behind.
+    """
+    with open(path, 'rb') as f:
+        return TTFont(io.BytesIO(f.read()), lazy=True)
+
+# Each font file is parsed by fonttools at most once per process and shared by
+# the kerning and ligature extraction passes; faces whose results all come
+# from --cache-dir are never parsed.
+tt_fonts = {}
+
+def get_tt_font(face_idx):
+    if face_idx not in tt_fonts:
+        tt_fonts[face_idx] = open_tt_font(args.fontstack[face_idx])
+    return tt_fonts[face_idx]
+
+def extract_face_kerning(face_idx):
+    cps = face_idx_cps[face_idx]
+    return cached_extraction(
+        'kerning', face_idx, cps, lambda: extract_kerning_fonttools(get_tt_font(face_idx), cps))
+
+face_kerning = [extract_face_kerning(face_idx) for face_idx in face_idx_cps]
+
 kern_map = {}  # (leftCp, rightCp) -> adjust
-for face_idx, cps in face_idx_cps.items():
-    font_path = args.fontstack[face_idx]
-    kern_map.update(extract_kerning_fonttools(font_path, cps, ppem))
+for units_per_em, cp_kern in face_kerning:
+    kern_map.update(scale_kerning(cp_kern, units_per_em, ppem))
 
 print(f"kerning: {len(kern_map)} pairs extracted", file=sys.stderr)
 
 # --- Derive class-based kerning from pairs ---
 kern_left_classes = []   # list of (codepoint, classId)
 kern_right_classes = []  # list of (codepoint, classId)
-kern_matrix = []         # flat list of int8_t values
+kern_matrix = array('b')  # flat int8_t values
 kern_left_class_count = 0
 kern_right_class_count = 0
 
+def group_profiles(matrix):
+    """Assign 1-based class IDs to the identical rows of a 2-D array.
+
+    Classes are numbered in order of first appearance. Returns the class ID
+    of every row and the index of the first row of each class.
+    """
+    _, first_rows, inverse = np.unique(matrix, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first_rows)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.reshape(-1)] + 1, first_rows[order]
+
 if kern_map:
-    all_left_cps = {lcp for lcp, _ in kern_map}
-    all_right_cps = {rcp for _, rcp in kern_map}
-
-    sorted_right_cps = sorted(all_right_cps)
-    sorted_left_cps = sorted(all_left_cps)
-
-    # Group left codepoints by identical adjustment row
-    left_profile_to_class = {}
-    left_class_map = {}
-    left_class_id = 1
-    for lcp in sorted(all_left_cps):
-        row = tuple(kern_map.get((lcp, rcp), 0) for rcp in sorted_right_cps)
-        if row not in left_profile_to_class:
-            left_profile_to_class[row] = left_class_id
-            left_class_id += 1
-        left_class_map[lcp] = left_profile_to_class[row]
-
-    # Group right codepoints by identical adjustment column
-    right_profile_to_class = {}
-    right_class_map = {}
-    right_class_id = 1
-    for rcp in sorted(all_right_cps):
-        col = tuple(kern_map.get((lcp, rcp), 0) for lcp in sorted_left_cps)
-        if col not in right_profile_to_class:
-            right_profile_to_class[col] = right_class_id
-            right_class_id += 1
-        right_class_map[rcp] = right_profile_to_class[col]
-
-    kern_left_class_count = left_class_id - 1
-    kern_right_class_count = right_class_id - 1
-
-    if kern_left_class_count > 255 or kern_right_class_count > 255:
-        print(f"WARNING: kerning class count exceeds uint8_t range "
-              f"(left={kern_left_class_count}, right={kern_right_class_count})",
-              file=sys.stderr)
-
-    # Build the class x class matrix
-    kern_matrix = [0] * (kern_left_class_count * kern_right_class_count)
-    for (lcp, rcp), adjust in kern_map.items():
-        lc = left_class_map[lcp] - 1
-        rc = right_class_map[rcp] - 1
-        kern_matrix[lc * kern_right_class_count + rc] = adjust
-
-    # Build sorted class entry lists
-    kern_left_classes = sorted(left_class_map.items())
-    kern_right_classes = sorted(right_class_map.items())
+    # Sort and index the left and right codepoints of every pair in one go
+    pair_cps = np.array(list(kern_map), dtype=np.int64).reshape(-1, 2)
+    pair_adjusts = np.fromiter(kern_map.values(), dtype=np.int8, count=len(kern_map))
+    sorted_left_cps, left_pos = np.unique(pair_cps[:, 0], return_inverse=True)
+    sorted_right_cps, right_pos = np.unique(pair_cps[:, 1], return_inverse=True)
+    sorted_left_cps = sorted_left_cps.tolist()
+    sorted_right_cps = sorted_right_cps.tolist()
+
+    # Dense left x right adjustment matrix
+    pair_matrix = np.zeros((len(sorted_left_cps), len(sorted_right_cps)), dtype=np.int8)
+    pair_matrix[left_pos, right_pos] = pair_adjusts
+
+    # Group left codepoints by identical adjustment row, and right
+    # codepoints by identical adjustment column
+    left_class_ids, left_reps = group_profiles(pair_matrix)
+    right_class_ids, right_reps = group_profiles(pair_matrix.T)
+
+if kern_map and (len(left_reps) > 255 or len(right_reps) > 255):
+    # Class IDs are stored as uint8_t, so such a table cannot be emitted;
+    # skip building the matrix and write the font without kerning
+    print(f"WARNING: kerning class count exceeds uint8_t range "
+          f"(left={len(left_reps)}, right={len(right_reps)}), dropping kerning",
+          file=sys.stderr)
+    kern_map = {}
+
+if kern_map:
+    kern_left_class_count = len(left_reps)
+    kern_right_class_count = len(right_reps)
+
+    # Build the class x class matrix from one representative row/column per class
+    kern_matrix = array('b', pair_matrix[np.ix_(left_reps, right_reps)].tobytes())
+
+    # Build sorted class entry lists (codepoints are already in order)
+    kern_left_classes = list(zip(sorted_left_cps, left_class_ids.tolist()))
+    kern_right_classes = list(zip(sorted_right_cps, right_class_ids.tolist()))
 
     matrix_size = kern_left_class_count * kern_right_class_count
     entries_size = (len(kern_left_classes) + len(kern_right_classes)) * 3
@@ -539,13 +661,12 @@ STANDARD_LIGATURE_MAP = {
     (0x73, 0x74):       0xFB06,  # st
 }
 
-def extract_ligatures_fonttools(font_path, codepoints):
-    """Extract ligature substitution pairs from a font file using fonttools.
+def extract_ligatures_fonttools(font, codepoints):
+    """Extract ligature substitution pairs from a parsed fonttools TTFont.
 
     Returns list of (packed_pair, ligature_codepoint) for the given codepoints.
     Multi-character ligatures are decomposed into chained pairs.
     """
-    font = TTFont(font_path)
     cmap = font.getBestCmap() or {}
 
     # Build glyph_name -> codepoint and codepoint -> glyph_name maps
@@ -614,33 +735,29 @@ def extract_ligatures_fonttools(font_path, codepoints):
                             continue
                         raw_ligatures[seq] = lig_cp
 
-    font.close()
-
     # Filter: only keep ligatures where all input and output codepoints are
     # in our generated glyph set
-    filtered = {}
-    for seq, lig_cp in raw_ligatures.items():
-        if lig_cp not in codepoints and lig_cp not in all_codepoints_set:
-            continue
-        if all(cp in codepoints for cp in seq):
-            filtered[seq] = lig_cp
+    cps_set = frozenset(codepoints)
+    lig_cps_set = cps_set | all_codepoints_set
+    filtered = {seq: lig_cp for seq, lig_cp in raw_ligatures.items()
+                if lig_cp in lig_cps_set and cps_set.issuperset(seq)}
 
     # Decompose into chained pairs
     # For 2-codepoint sequences: direct pair (a, b) -> lig
     # For 3+ codepoint sequences: chain through intermediates
     #   e.g., (f, f, i) -> ffi requires (f, f) -> ff to exist,
     #   then we add (ff, i) -> ffi
+    # 2-codepoint ligatures are emitted as they are seen; longer ones are
+    # queued for a second sweep over just those sequences.
     pairs = []
-    # First pass: collect all 2-codepoint ligatures
-    two_char = {seq: lig_cp for seq, lig_cp in filtered.items() if len(seq) == 2}
-    for seq, lig_cp in two_char.items():
-        packed = (seq[0] << 16) | seq[1]
-        pairs.append((packed, lig_cp))
-
-    # Second pass: decompose 3+ codepoint ligatures into chained pairs
+    longer = []
     for seq, lig_cp in filtered.items():
-        if len(seq) < 3:
-            continue
+        if len(seq) == 2:
+            pairs.append(((seq[0] << 16) | seq[1], lig_cp))
+        elif len(seq) > 2:
+            longer.append((seq, lig_cp))
+
+    for seq, lig_cp in longer:
         # Try to find an intermediate: check if the first N-1 codepoints
         # form a known ligature, then chain (intermediate, last) -> lig
         prefix = seq[:-1]
@@ -656,35 +773,20 @@ def extract_ligatures_fonttools(font_path, codepoints):
 
     return pairs
 
-ligature_codepoints = set(cp for cp in all_codepoints
-                          if not (COMBINING_MARKS_START <= cp <= COMBINING_MARKS_END))
-
-# Map ligature codepoints to the font-stack index that serves them
-lig_cp_to_face_idx = {}
-for cp in ligature_codepoints:
-    for face_idx, f in enumerate(font_stack):
-        if f.get_char_index(cp) > 0:
-            lig_cp_to_face_idx[cp] = face_idx
-            break
-
-# Group by face index
-lig_face_idx_cps = {}
-for cp, fi in lig_cp_to_face_idx.items():
-    lig_face_idx_cps.setdefault(fi, set()).add(cp)
-
 ligature_pairs = []
-for face_idx, cps in lig_face_idx_cps.items():
-    font_path = args.fontstack[face_idx]
-    ligature_pairs.extend(extract_ligatures_fonttools(font_path, cps))
+for face_idx, cps in face_idx_cps.items():
+    ligature_pairs.extend(cached_extraction(
+        'ligatures', face_idx, cps, lambda: extract_ligatures_fonttools(get_tt_font(face_idx), cps)))
+
+for tt_font in tt_fonts.values():
+    tt_font.close()
 
-# Deduplicate (keep first occurrence) and sort
-seen_lig_keys = set()
-unique_ligature_pairs = []
+# Deduplicate (keep first occurrence) and sort. Packed pairs are unique
+# once deduplicated, so the items sort by packed pair alone.
+unique_ligature_pairs = {}
 for packed, lig_cp in ligature_pairs:
-    if packed not in seen_lig_keys:
-        seen_lig_keys.add(packed)
-        unique_ligature_pairs.append((packed, lig_cp))
-ligature_pairs = sorted(unique_ligature_pairs, key=lambda p: p[0])
+    unique_ligature_pairs.setdefault(packed, lig_cp)
+ligature_pairs = sorted(unique_ligature_pairs.items())
 print(f"ligatures: {len(ligature_pairs)} pairs extracted", file=sys.stderr)
 
 compress = args.compress
@@ -700,21 +802,9 @@ def to_byte_aligned(packed, width, height):
     """
     if width == 0 or height == 0:
         return b''
-    row_stride = (width + 3) // 4  # bytes per byte-aligned row
-    aligned = bytearray(row_stride * height)
-    for y in range(height):
-        for x in range(width):
-            # Read pixel from packed format (continuous bit stream)
-            packed_pos = y * width + x
-            packed_byte_idx = packed_pos // 4
-            packed_shift = (3 - (packed_pos % 4)) * 2
-            pixel = (packed[packed_byte_idx] >> packed_shift) & 0x3
-
-            # Write pixel to byte-aligned format (row-aligned)
-            aligned_byte_idx = y * row_stride + x // 4
-            aligned_shift = (3 - (x % 4)) * 2
-            aligned[aligned_byte_idx] |= (pixel << aligned_shift)
-    return bytes(aligned)
+    # Pad every row of pixels out to whole bytes, then repack
+    rows = unpack_2bit(packed)[:width * height].reshape(height, width)
+    return pack_2bit(np.pad(rows, ((0, 0), (0, -width % 4))).reshape(-1)).tobytes()
 
 
 # Build groups for compression
@@ -770,48 +860,64 @@ if compress:
 
     # Compress each group
     compressed_groups = []  # list of (compressed_bytes, uncompressed_size, glyph_count, first_glyph_index)
-    compressed_bitmap_data = []
-    compressed_offset = 0
+    compressed_bitmap_data = bytearray()
 
     # Also build modified glyph props with within-group offsets
     modified_glyph_props = list(glyph_props)
 
+    # Raw DEFLATE (no zlib/gzip header). Every group is an independent stream
+    # so the firmware can inflate groups on demand; each one starts from a
+    # copy of this pristine compressor rather than re-running deflateInit.
+    # --deflate-search adds the other zlib strategies, which keeps the
+    # stream format the firmware's uzlib inflater expects while still
+    # winning a few percent on groups that are mostly runs of blank pixels.
+    group_compressors = [zlib.compressobj(level=9, wbits=-15)]
+    if args.deflate_search:
+        group_compressors += [zlib.compressobj(level=9, wbits=-15, strategy=strategy)
+                              for strategy in (zlib.Z_FILTERED, zlib.Z_RLE, zlib.Z_HUFFMAN_ONLY)]
+
+    # Byte-align every glyph into one contiguous buffer up front. Groups are
+    # runs of consecutive glyphs, so each one compresses a slice of it.
+    aligned_data = bytearray()
+    aligned_starts = []  # glyph index -> offset into aligned_data, plus the end
+    for props, packed in all_glyphs:
+        aligned_starts.append(len(aligned_data))
+        aligned_data += to_byte_aligned(packed, props.width, props.height)
+    aligned_starts.append(len(aligned_data))
+    aligned_view = memoryview(aligned_data)
+
     for first_idx, count in groups:
-        # Concatenate bitmap data for this group
+        # Update each glyph's dataOffset to be its within-group offset (packed offset)
         packed_len = 0
-        group_aligned = bytearray()
-        for gi in range(first_idx, first_idx + count):
-            props, packed = all_glyphs[gi]
-            # Update glyph's dataOffset to be within-group offset (packed offset)
-            within_group_offset = packed_len
-            old_props = modified_glyph_props[gi]
-            modified_glyph_props[gi] = GlyphProps(
-                width=old_props.width,
-                height=old_props.height,
-                advance_x=old_props.advance_x,
-                left=old_props.left,
-                top=old_props.top,
-                data_length=old_props.data_length,
-                data_offset=within_group_offset,
-                code_point=old_props.code_point,
-            )
+        for gi, (props, packed) in enumerate(all_glyphs[first_idx:first_idx + count], start=first_idx):
+            modified_glyph_props[gi] = props._replace(data_offset=packed_len)
             packed_len += len(packed)
-            group_aligned.extend(to_byte_aligned(packed, old_props.width, old_props.height))
 
-        # Compress byte-aligned data with raw DEFLATE (no zlib/gzip header)
-        compressor = zlib.compressobj(level=9, wbits=-15)
-        compressed = compressor.compress(bytes(group_aligned)) + compressor.flush()
+        group_aligned = aligned_view[aligned_starts[first_idx]:aligned_starts[first_idx + count]]
+
+        # Compress byte-aligned data, keeping the smallest stream (the first
+        # compressor wins ties so the default output is unchanged)
+        compressed = None
+        for group_compressor in group_compressors:
+            compressor = group_compressor.copy()
+            candidate = compressor.compress(group_aligned) + compressor.flush()
+            if compressed is None or len(candidate) < len(compressed):
+                compressed = candidate
 
         compressed_groups.append((compressed, len(group_aligned), count, first_idx))
-        compressed_bitmap_data.extend(compressed)
-        compressed_offset += len(compressed)
+        compressed_bitmap_data += compressed
 
     glyph_props = modified_glyph_props
     total_compressed = len(compressed_bitmap_data)
     total_uncompressed = len(glyph_data)
     print(f"// Compression: {total_uncompressed} -> {total_compressed} bytes ({100*total_compressed/total_uncompressed:.1f}%), {len(groups)} groups", file=sys.stderr)
 
-print(f"""/**
+# The header is assembled as a list of lines and written out in one go
+# rather than print()ed line by line
+out = []
+emit = out.append
+
+emit(f"""/**
  * generated by fontconvert.py
  * name: {font_name}
  * size: {size}
@@ -822,103 +928,125 @@ print(f"""/**
 #include "EpdFontData.h"
 """)
 
-if compress:
-    print(f"static const uint8_t {font_name}Bitmaps[{len(compressed_bitmap_data)}] = {{")
-    for c in chunks(compressed_bitmap_data, 16):
-        print ("    " + " ".join(f"0x{b:02X}," for b in c))
-    print ("};\n");
+# C hex literal for every byte value, so the bitmap dump is table lookups
+# rather than one format call per byte
+BYTE_HEX = [f"0x{b:02X}," for b in range(256)]
+# Same for the padded int8_t cells of the kerning matrix
+INT8_CELL = {v: f"{v:4d}" for v in range(-128, 128)}
+
+bitmap_data = compressed_bitmap_data if compress else glyph_data
+if args.binary_bitmaps:
+    # Raw bytes go to FILE and the assembler pulls them in with .incbin. GCC
+    # does not pass include paths to the assembler, so FILE is named relative
+    # to the project root, the directory PlatformIO runs the compiler from.
+    with open(args.binary_bitmaps, 'wb') as f:
+        f.write(bitmap_data)
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    incbin_path = os.path.relpath(os.path.abspath(args.binary_bitmaps), project_root).replace(os.sep, '/')
+    emit(f'extern "C" const uint8_t {font_name}Bitmaps[{len(bitmap_data)}];')
+    emit("__asm__(")
+    emit('    ".section .rodata\\n"')
+    emit(f'    ".global {font_name}Bitmaps\\n"')
+    emit(f'    "{font_name}Bitmaps:\\n"')
+    emit(f'    ".incbin \\"{incbin_path}\\"\\n"')
+    emit('    ".previous\\n"')
+    emit(");\n")
 else:
-    print(f"static const uint8_t {font_name}Bitmaps[{len(glyph_data)}] = {{")
-    for c in chunks(glyph_data, 16):
-        print ("    " + " ".join(f"0x{b:02X}," for b in c))
-    print ("};\n");
+    emit(f"static const uint8_t {font_name}Bitmaps[{len(bitmap_data)}] = {{")
+    # Slice a memoryview so each 16-byte row is read in place, not copied out
+    out.extend(["    " + " ".join([BYTE_HEX[b] for b in c]) for c in chunks(memoryview(bitmap_data), 16)])
+    emit("};\n")
 
 def cp_label(cp):
     if cp == 0x5C:
         return '<backslash>'
     return chr(cp) if 0x20 < cp < 0x7F else f'U+{cp:04X}'
 
-print(f"static const EpdGlyph {font_name}Glyphs[] = {{")
-for i, g in enumerate(glyph_props):
-    print ("    { " + ", ".join([f"{a}" for a in list(g[:-1])]),"},", f"// {cp_label(g.code_point)}")
-print ("};\n");
+emit(f"static const EpdGlyph {font_name}Glyphs[] = {{")
+# One format call per glyph, straight from the GlyphProps fields
+glyph_line = "    {{ {}, {}, {}, {}, {}, {}, {} }}, // {}".format
+for g in glyph_props:
+    emit(glyph_line(*g[:-1], cp_label(g.code_point)))
+emit("};\n")
 
-print(f"static const EpdUnicodeInterval {font_name}Intervals[] = {{")
+emit(f"static const EpdUnicodeInterval {font_name}Intervals[] = {{")
 offset = 0
 for i_start, i_end in intervals:
-    print (f"    {{ 0x{i_start:X}, 0x{i_end:X}, 0x{offset:X} }},")
+    emit(f"    {{ 0x{i_start:X}, 0x{i_end:X}, 0x{offset:X} }},")
     offset += i_end - i_start + 1
-print ("};\n");
+emit("};\n")
 
 if compress:
-    print(f"static const EpdFontGroup {font_name}Groups[] = {{")
+    emit(f"static const EpdFontGroup {font_name}Groups[] = {{")
     compressed_offset = 0
     for compressed, uncompressed_size, count, first_idx in compressed_groups:
-        print(f"    {{ {compressed_offset}, {len(compressed)}, {uncompressed_size}, {count}, {first_idx} }},")
+        emit(f"    {{ {compressed_offset}, {len(compressed)}, {uncompressed_size}, {count}, {first_idx} }},")
         compressed_offset += len(compressed)
-    print("};\n")
+    emit("};\n")
 
 if kern_map:
-    print(f"static const EpdKernClassEntry {font_name}KernLeftClasses[] = {{")
+    emit(f"static const EpdKernClassEntry {font_name}KernLeftClasses[] = {{")
     for cp, cls in kern_left_classes:
-        print(f"    {{ 0x{cp:04X}, {cls} }}, // {cp_label(cp)}")
-    print("};\n")
+        emit(f"    {{ 0x{cp:04X}, {cls} }}, // {cp_label(cp)}")
+    emit("};\n")
 
-    print(f"static const EpdKernClassEntry {font_name}KernRightClasses[] = {{")
+    emit(f"static const EpdKernClassEntry {font_name}KernRightClasses[] = {{")
     for cp, cls in kern_right_classes:
-        print(f"    {{ 0x{cp:04X}, {cls} }}, // {cp_label(cp)}")
-    print("};\n")
+        emit(f"    {{ 0x{cp:04X}, {cls} }}, // {cp_label(cp)}")
+    emit("};\n")
 
-    print(f"static const int8_t {font_name}KernMatrix[] = {{")
+    emit(f"static const int8_t {font_name}KernMatrix[] = {{")
     for row in range(kern_left_class_count):
         row_start = row * kern_right_class_count
         row_vals = kern_matrix[row_start:row_start + kern_right_class_count]
-        print("    " + ", ".join(f"{v:4d}" for v in row_vals) + ",")
-    print("};\n")
+        emit("    " + ", ".join([INT8_CELL[v] for v in row_vals]) + ",")
+    emit("};\n")
 
 if ligature_pairs:
-    print(f"static const EpdLigaturePair {font_name}LigaturePairs[] = {{")
+    emit(f"static const EpdLigaturePair {font_name}LigaturePairs[] = {{")
     for packed_pair, lig_cp in ligature_pairs:
-        print(f"    {{ 0x{packed_pair:08X}, 0x{lig_cp:04X} }}, // {cp_label(packed_pair >> 16)} {cp_label(packed_pair & 0xFFFF)} -> {cp_label(lig_cp)}")
-    print("};\n")
-
-print(f"static const EpdFontData {font_name} = {{")
-print(f"    {font_name}Bitmaps,")
-print(f"    {font_name}Glyphs,")
-print(f"    {font_name}Intervals,")
-print(f"    {len(intervals)},")
-print(f"    {norm_ceil(face.size.height)},")
-print(f"    {norm_ceil(face.size.ascender)},")
-print(f"    {norm_floor(face.size.descender)},")
-print(f"    {'true' if is2Bit else 'false'},")
+        emit(f"    {{ 0x{packed_pair:08X}, 0x{lig_cp:04X} }}, // {cp_label(packed_pair >> 16)} {cp_label(packed_pair & 0xFFFF)} -> {cp_label(lig_cp)}")
+    emit("};\n")
+
+emit(f"static const EpdFontData {font_name} = {{")
+emit(f"    {font_name}Bitmaps,")
+emit(f"    {font_name}Glyphs,")
+emit(f"    {font_name}Intervals,")
+emit(f"    {len(intervals)},")
+emit(f"    {norm_ceil(face.size.height)},")
+emit(f"    {norm_ceil(face.size.ascender)},")
+emit(f"    {norm_floor(face.size.descender)},")
+emit(f"    {'true' if is2Bit else 'false'},")
 if compress:
-    print(f"    {font_name}Groups,")
-    print(f"    {len(compressed_groups)},")
+    emit(f"    {font_name}Groups,")
+    emit(f"    {len(compressed_groups)},")
 else:
-    print("    nullptr,")
-    print("    0,")
+    emit("    nullptr,")
+    emit("    0,")
 # glyphToGroup (not used for script-grouped fonts)
-print("    nullptr,")
+emit("    nullptr,")
 if kern_map:
-    print(f"    {font_name}KernLeftClasses,")
-    print(f"    {font_name}KernRightClasses,")
-    print(f"    {font_name}KernMatrix,")
-    print(f"    {len(kern_left_classes)},")
-    print(f"    {len(kern_right_classes)},")
-    print(f"    {kern_left_class_count},")
-    print(f"    {kern_right_class_count},")
+    emit(f"    {font_name}KernLeftClasses,")
+    emit(f"    {font_name}KernRightClasses,")
+    emit(f"    {font_name}KernMatrix,")
+    emit(f"    {len(kern_left_classes)},")
+    emit(f"    {len(kern_right_classes)},")
+    emit(f"    {kern_left_class_count},")
+    emit(f"    {kern_right_class_count},")
 else:
-    print(f"    nullptr,")
-    print(f"    nullptr,")
-    print(f"    nullptr,")
-    print(f"    0,")
-    print(f"    0,")
-    print(f"    0,")
-    print(f"    0,")
+    emit(f"    nullptr,")
+    emit(f"    nullptr,")
+    emit(f"    nullptr,")
+    emit(f"    0,")
+    emit(f"    0,")
+    emit(f"    0,")
+    emit(f"    0,")
 if ligature_pairs:
-    print(f"    {font_name}LigaturePairs,")
-    print(f"    {len(ligature_pairs)},")
+    emit(f"    {font_name}LigaturePairs,")
+    emit(f"    {len(ligature_pairs)},")
 else:
-    print(f"    nullptr,")
-    print(f"    0,")
-print("};")
+    emit(f"    nullptr,")
+    emit(f"    0,")
+emit("};")
+
+sys.stdout.write("\n".join(out) + "\n")
@@ -14,12 +14,13 @@ import os
 import re
 import sys
 import zlib
+from concurrent.futures import ProcessPoolExecutor
 
 
 def parse_hex_array(text):
     """Extract bytes from a C hex array string like '{ 0xAB, 0xCD, ... }'"""
-    hex_vals = re.findall(r'0x([0-9A-Fa-f]{2})', text)
-    return bytes(int(h, 16) for h in hex_vals)
+    # bytes.fromhex skips the whitespace left between values
+    return bytes.fromhex(text.replace('0x', '').replace(',', ' '))
 
 
 def parse_uint8_array(text):
@@ -57,11 +58,19 @@ def parse_glyphs(text):
     return glyphs
 
 
-def get_group_glyph_indices(group, group_index, glyphs, glyph_to_group):
+def group_glyph_members(glyph_to_group, group_count):
+    """Bucket glyph indices by group in one pass over a glyphToGroup mapping."""
+    members = [[] for _ in range(group_count)]
+    for glyph_idx, group_index in enumerate(glyph_to_group):
+        members[group_index].append(glyph_idx)
+    return members
+
+
+def get_group_glyph_indices(group, group_index, group_members):
     """Get the ordered list of glyph indices belonging to a group."""
-    if glyph_to_group is not None:
-        # Frequency-grouped: scan all glyphs
-        return [i for i in range(len(glyphs)) if glyph_to_group[i] == group_index]
+    if group_members is not None:
+        # Frequency-grouped: bucketed once by group_glyph_members
+        return group_members[group_index]
     else:
         # Contiguous: sequential from firstGlyphIndex
         first = group['firstGlyphIndex']
@@ -77,23 +86,18 @@ def compact_aligned_to_packed(aligned_data, width, height):
     if width == 0 or height == 0:
         return b''
     packed_size = math.ceil(width * height / 4)
-    packed = bytearray(packed_size)
     row_stride = (width + 3) // 4  # bytes per byte-aligned row
+    row_bits = width * 2
+    row_padding = row_stride * 8 - row_bits
 
-    for y in range(height):
-        for x in range(width):
-            # Read pixel from byte-aligned format (row-aligned)
-            aligned_byte_idx = y * row_stride + x // 4
-            aligned_shift = (3 - (x % 4)) * 2
-            pixel = (aligned_data[aligned_byte_idx] >> aligned_shift) & 0x3
-
-            # Write pixel to packed format (continuous bit stream)
-            packed_pos = y * width + x
-            packed_byte_idx = packed_pos // 4
-            packed_shift = (3 - (packed_pos % 4)) * 2
-            packed[packed_byte_idx] |= (pixel << packed_shift)
+    # Treat the bitmap as one big integer: drop each row's trailing padding
+    # bits and append its pixels, so the work is per row rather than per pixel
+    bits = 0
+    for start in range(0, height * row_stride, row_stride):
+        row = int.from_bytes(aligned_data[start:start + row_stride], 'big')
+        bits = (bits << row_bits) | (row >> row_padding)
 
-    return bytes(packed)
+    return (bits << (packed_size * 8 - row_bits * height)).to_bytes(packed_size, 'big')
 
 
 def verify_font_file(filepath):
@@ -142,6 +146,7 @@ def verify_font_file(filepath):
 
     # Check for glyphToGroup array (frequency-grouped fonts)
     glyph_to_group = None
+    group_members = None
     g2g_match = re.search(
         r'static const uint16_t ' + re.escape(font_name) + r'GlyphToGroup\[\]\s*=\s*\{(.+?)\};',
         content, re.DOTALL
@@ -153,6 +158,7 @@ def verify_font_file(filepath):
         max_group_id = max(glyph_to_group)
         if max_group_id >= len(groups):
             return (font_name, False, f"glyphToGroup contains group ID {max_group_id} but only {len(groups)} groups exist")
+        group_members = group_glyph_members(glyph_to_group, len(groups))
 
     # Verify each group
     for gi, group in enumerate(groups):
@@ -171,7 +177,7 @@ def verify_font_file(filepath):
             return (font_name, False, f"group {gi}: size mismatch (expected {group['uncompressedSize']}, got {len(decompressed)})")
 
         # Get glyph indices for this group
-        group_glyph_indices = get_group_glyph_indices(group, gi, glyphs, glyph_to_group)
+        group_glyph_indices = get_group_glyph_indices(group, gi, group_members)
         if glyph_to_group is not None and len(group_glyph_indices) != group['glyphCount']:
             return (font_name, False,
                     f"group {gi}: glyphCount {group['glyphCount']} != mapping count {len(group_glyph_indices)}")
@@ -245,10 +251,13 @@ def main():
     failed = 0
     skipped = 0
 
-    for filename in files:
-        filepath = os.path.join(font_dir, filename)
-        _font_name, success, message = verify_font_file(filepath)
+    # Files are independent, so verify them across processes; map keeps the
+    # report in file order
+    filepaths = [os.path.join(font_dir, filename) for filename in files]
+    with ProcessPoolExecutor() as pool:
+        results = list(pool.map(verify_font_file, filepaths))
 
+    for filename, (_font_name, success, message) in zip(files, results):
         if success is None:
             skipped += 1
         elif success:
@@ -34,26 +34,15 @@ def image_to_c_array(img, array_name):
     # Convert to grayscale
     img = img.convert('L')
     width, height = img.size
-    pixels = list(img.getdata())
-    packed = []
-    for y in range(height):
-        for x in range(0, width, 8):
-            byte = 0
-            for b in range(8):
-                if x + b < width:
-                    v = pixels[y * width + x + b]
-                    # 1 for white, 0 for black
-                    bit = 1 if v >= threshold else 0
-                    byte |= (bit << (7 - b))
-            packed.append(byte)
+    # 1 for white, 0 for black, thresholded by PIL through a 256-entry lookup
+    # table; a mode '1' image packs MSB-first with each row padded to a byte
+    packed = img.point([0] * threshold + [255] * (256 - threshold), '1').tobytes()
     # Format as C array
     c = f'#pragma once\n#include <cstdint>\n\n'
     c += f'// size: {width}x{height}\n'
     c += f'static const uint8_t {array_name}[] = {{\n    '
-    for i, v in enumerate(packed):
-        c += f'0x{v:02X}, '
-        if (i + 1) % 16 == 0:
-            c += '\n    '
+    # 16 bytes per row, built as row strings and joined once
+    c += ', \n    '.join(', '.join(f'0x{v:02X}' for v in packed[i:i + 16]) for i in range(0, len(packed), 16))
     c = c.rstrip(', \n') + '\n};\n'
     return c
 
@@ -80,6 +80,10 @@ free_mem_data: deque[float] = deque(maxlen=MAX_POINTS)
 total_mem_data: deque[float] = deque(maxlen=MAX_POINTS)
 max_alloc_data: deque[float] = deque(maxlen=MAX_POINTS)
 data_lock: threading.Lock = threading.Lock()  # Prevent reading while writing
+# Samples appended so far, and how many of them the graph last showed;
+# the chart is only rebuilt when these differ
+mem_samples_added = 0
+mem_samples_drawn = 0
 
 # Global shutdown flag
 shutdown_event = threading.Event()
@@ -151,6 +155,20 @@ COLOR_KEYWORDS: dict[str, list[str]] = {
     Fore.LIGHTGREEN_EX: ["[FNS]", "FOOTNOTE"],
 }
 
+# Each color's keywords as one compiled alternation, checked in the same
+# priority order, so a line costs one regex search per color rather than
+# one substring scan per keyword
+COLOR_PATTERNS: list[tuple[re.Pattern[str], str]] = [
+    (re.compile("|".join(re.escape(keyword) for keyword in keywords)), color)
+    for color, keywords in COLOR_KEYWORDS.items()
+]
+
+# One pass over a MEM line picks up every stat it carries
+MEMORY_STAT_RE = re.compile(r"\b(Free|Total|MaxAlloc):\s*(\d+)")
+# Device uptime prefix, replaced by the PC time; only tried on lines
+# starting with "[" so untagged output never reaches the regex engine
+DEVICE_TIMESTAMP_RE = re.compile(r"^\[\d+\]")
+
 
 def signal_handler(signum, frame):
     """Handle SIGINT (Ctrl-C) by setting the shutdown event."""
@@ -167,8 +185,8 @@ def get_color_for_line(line: str) -> str:
     Classify log lines by type and assign appropriate colors.
     """
     line_upper = line.upper()
-    for color, keywords in COLOR_KEYWORDS.items():
-        if any(keyword in line_upper for keyword in keywords):
+    for pattern, color in COLOR_PATTERNS:
+        if pattern.search(line_upper):
             return color
     return Fore.WHITE
 
@@ -179,28 +197,21 @@ def parse_memory_line(line: str) -> tuple[int | None, int | None, int | None]:
     Format: Free: N bytes, Total: N bytes, Min Free: N bytes, MaxAlloc: N bytes
     Returns: (free_bytes, total_bytes, max_alloc_bytes)
     """
-    def _find(pattern: str) -> int | None:
-        m = re.search(pattern, line)
-        if m:
-            try:
-                return int(m.group(1))
-            except ValueError:
-                pass
-        return None
-
-    return (
-        _find(r"\bFree:\s*(\d+)"),
-        _find(r"\bTotal:\s*(\d+)"),
-        _find(r"\bMaxAlloc:\s*(\d+)"),
-    )
+    found: dict[str, int] = {}
+    for m in MEMORY_STAT_RE.finditer(line):
+        # Keep the first value of each key, as separate searches would
+        found.setdefault(m.group(1), int(m.group(2)))
+
+    return found.get("Free"), found.get("Total"), found.get("MaxAlloc")
 
 
-def serial_worker(ser, kwargs: dict[str, str]) -> None:
+def serial_worker(ser, kwargs: dict[str, str]) -> None:  # pylint: disable=global-statement
     """
     Runs in a background thread. Handles reading serial data, printing to console,
     updating memory usage data for graphing, and processing screenshot data.
     Monitors the global shutdown event for graceful termination.
     """
+    global mem_samples_added
     print(f"{Fore.CYAN}--- Opening serial port ---{Style.RESET_ALL}")
     filter_keyword = kwargs.get("filter", "").lower()
     suppress = kwargs.get("suppress", "").lower()
@@ -221,18 +232,34 @@ def serial_worker(ser, kwargs: dict[str, str]) -> None:
 
     expecting_screenshot = False
     screenshot_size = 0
-    screenshot_data = b""
+    # Grown in place as chunks arrive, rather than rebuilt by bytes +=
+    screenshot_data = bytearray()
+    # Serial input is read in bulk; bytes past the last complete line wait
+    # here, and may be the start of a screenshot following its header line
+    pending = bytearray()
+    # Lines decoded from one read are printed together in a single write
+    console_lines: list[str] = []
+
+    def flush_console() -> None:
+        if console_lines:
+            print("\n".join(console_lines))
+            console_lines.clear()
 
     try:
         while not shutdown_event.is_set():
             if expecting_screenshot:
-                data = ser.read(screenshot_size - len(screenshot_data))
+                remaining = screenshot_size - len(screenshot_data)
+                if pending:
+                    data = pending[:remaining]
+                    del pending[:remaining]
+                else:
+                    data = ser.read(remaining)
                 if not data:
                     continue
                 screenshot_data += data
                 if len(screenshot_data) == screenshot_size:
                     if Image:
-                        img = Image.frombytes("1", (800, 480), screenshot_data)
+                        img = Image.frombytes("1", (800, 480), bytes(screenshot_data))
                         # We need to rotate the image because the raw data is in landscape mode
                         img = img.transpose(Image.ROTATE_270)
                         img.save("screenshot.bmp")
@@ -246,10 +273,26 @@ def serial_worker(ser, kwargs: dict[str, str]) -> None:
                             f"{Fore.GREEN}Screenshot saved to screenshot.raw (PIL not available){Style.RESET_ALL}"
                         )
                     expecting_screenshot = False
-                    screenshot_data = b""
+                    screenshot_data.clear()
             else:
                 try:
-                    raw_data = ser.readline().decode("utf-8", errors="replace")
+                    line_end = pending.find(b"\n") + 1
+                    if not line_end:
+                        flush_console()
+                        # One read takes whatever has arrived, instead of
+                        # readline() pulling the port a byte at a time
+                        data = ser.read(ser.in_waiting or 1)
+                        if data:
+                            pending += data
+                            continue
+                        if not pending:
+                            continue
+                        # The read timed out with a partial line buffered (a
+                        # prompt, or output cut short by a reset): pass it on
+                        # as a line, as readline() did when it timed out
+                        line_end = len(pending)
+                    raw_data = pending[:line_end].decode("utf-8", errors="replace")
+                    del pending[:line_end]
 
                     if not raw_data:
                         continue
@@ -259,6 +302,7 @@ def serial_worker(ser, kwargs: dict[str, str]) -> None:
                         continue
 
                     if clean_line.startswith("SCREENSHOT_START:"):
+                        flush_console()
                         screenshot_size = int(clean_line.split(":")[1])
                         expecting_screenshot = True
                         continue
@@ -267,7 +311,9 @@ def serial_worker(ser, kwargs: dict[str, str]) -> None:
 
                     # Add PC timestamp
                     pc_time = datetime.now().strftime("%H:%M:%S")
-                    formatted_line = re.sub(r"^\[\d+\]", f"[{pc_time}]", clean_line)
+                    formatted_line = clean_line
+                    if clean_line.startswith("["):
+                        formatted_line = DEVICE_TIMESTAMP_RE.sub(f"[{pc_time}]", clean_line, count=1)
 
                     # Check for Memory Line
                     if "[MEM]" in formatted_line:
@@ -278,6 +324,7 @@ def serial_worker(ser, kwargs: dict[str, str]) -> None:
                                 free_mem_data.append(free_val / 1024)
                                 total_mem_data.append(total_val / 1024)
                                 max_alloc_data.append((max_alloc_val or 0) / 1024)
+                                mem_samples_added += 1
                     # Apply filters
                     if filter_keyword and filter_keyword not in formatted_line.lower():
                         continue
@@ -285,9 +332,10 @@ def serial_worker(ser, kwargs: dict[str, str]) -> None:
                         continue
                     # Print to console
                     line_color = get_color_for_line(formatted_line)
-                    print(f"{line_color}{formatted_line}")
+                    console_lines.append(f"{line_color}{formatted_line}")
 
                 except (OSError, UnicodeDecodeError):
+                    flush_console()
                     print(
                         f"{Fore.RED}Device disconnected or data error.{Style.RESET_ALL}"
                     )
@@ -296,7 +344,7 @@ def serial_worker(ser, kwargs: dict[str, str]) -> None:
         # If thread is killed violently (e.g. main exit), silence errors
         pass
     finally:
-        pass  # ser closed in main
+        flush_console()  # ser closed in main
 
 
 def input_worker(ser) -> None:
@@ -312,20 +360,23 @@ def input_worker(ser) -> None:
             break
 
 
-def update_graph(frame) -> list:  # pylint: disable=unused-argument
+def update_graph(frame) -> list:  # pylint: disable=unused-argument,global-statement
     """
     Called by Matplotlib animation to redraw the memory usage chart.
     Monitors the global shutdown event and closes the plot when shutdown is requested.
     Shows DRAM metrics (free, total, max contiguous alloc) and an optional PSRAM subplot.
+    Frames with no new memory samples leave the current chart untouched.
     """
+    global mem_samples_drawn
     if shutdown_event.is_set():
         plt.close("all")
         return []
 
     with data_lock:
-        if not time_data:
+        if not time_data or mem_samples_drawn == mem_samples_added:
             return []
 
+        mem_samples_drawn = mem_samples_added
         x = list(time_data)
         y_free = list(free_mem_data)
         y_total = list(total_mem_data)
@@ -16,6 +16,12 @@ Two modes (mutually exclusive, one required):
 Common options:
   --env ENV            PlatformIO build environment (default: "default")
   --csv [FILE]         Output as CSV.  Without FILE, writes to stdout.
+  --jobs N             Build N commits at a time (default: 1).
+  --build-cache DIR    Share PlatformIO's object cache in DIR across all
+                       builds, so unchanged sources compile only once.
+
+Commits are built in temporary git worktrees, so the current checkout, its
+branch and any uncommitted changes are never touched.
 
 Output is a human-readable table by default.  Use --csv for machine-readable
 output.
@@ -25,18 +31,28 @@ Examples:
     python3 scripts/firmware_size_history.py --range abc1234 def5678 --env gh_release --csv sizes.csv
     python3 scripts/firmware_size_history.py --commits main feature/new-parser
     python3 scripts/firmware_size_history.py --commits abc1234 def5678 ghi9012 --csv
+    python3 scripts/firmware_size_history.py --range HEAD~8 HEAD --jobs 4 --build-cache /tmp/pio-cache
 """
 
 import argparse
 import csv
+import functools
+import os
+import queue
 import re
+import shutil
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 FLASH_RE = re.compile(
     r"Flash:.*?(\d+)\s+bytes\s+from\s+(\d+)\s+bytes"
 )
 BOX_CHAR = "\u2500"
+# Untracked files in the main checkout that pio reads (platformio.ini pulls
+# in platformio.local.ini via extra_configs); worktrees get a link to each.
+LOCAL_CONFIG_FILES = ("platformio.local.ini",)
 
 
 def run(cmd, capture=True, check=True):
@@ -46,6 +62,7 @@ def run(cmd, capture=True, check=True):
     return result
 
 
+@functools.lru_cache(maxsize=None)
 def resolve_ref(ref):
     """Resolve a git ref to (full_sha, title), or sys.exit with a message."""
     r = run(["git", "rev-parse", "--verify", ref], check=False)
@@ -57,14 +74,6 @@ def resolve_ref(ref):
     return sha, title
 
 
-def git_current_ref():
-    """Return the current branch name, or the detached commit hash."""
-    r = run(["git", "symbolic-ref", "--short", "HEAD"], check=False)
-    if r.returncode == 0:
-        return r.stdout.strip()
-    return run(["git", "rev-parse", "HEAD"]).stdout.strip()
-
-
 def git_commit_list(start, end):
     """Return list of (hash, title) from start (exclusive) to end (inclusive), oldest first."""
     r = run([
@@ -80,21 +89,84 @@ def git_commit_list(start, end):
     return commits
 
 
-def git_checkout(ref):
-    run(["git", "checkout", "--detach", ref], check=True)
-
-
-def build_firmware(env):
-    """Run pio build and return the raw combined stdout+stderr."""
-    result = subprocess.run(
+def git_toplevel():
+    """Return the absolute path of the main checkout."""
+    return run(["git", "rev-parse", "--show-toplevel"]).stdout.strip()
+
+
+def git_submodule_paths(toplevel):
+    """Return submodule paths relative to the top of the checkout."""
+    gitmodules = os.path.join(toplevel, ".gitmodules")
+    r = run(["git", "config", "--file", gitmodules, "--get-regexp", r"\.path$"], check=False)
+    return [line.split(" ", 1)[1] for line in r.stdout.splitlines() if line]
+
+
+def link_submodules(worktree, toplevel, submodules):
+    """Point a worktree at the main checkout's submodules and local config.
+
+    Every commit is built against whatever submodule revision is checked out
+    in the main checkout, so worktrees link its submodule directories instead
+    of cloning their own.  Git recreates the empty directory whenever a
+    checkout changes the submodule commit, so this runs after every checkout.
+    Untracked local overrides such as platformio.local.ini are linked too, so
+    builds honour them as they would in the main checkout.
+    """
+    for sub in submodules:
+        path = os.path.join(worktree, sub)
+        if os.path.isdir(path) and not os.path.islink(path) and not os.listdir(path):
+            os.rmdir(path)
+            os.symlink(os.path.join(toplevel, sub), path)
+    for name in LOCAL_CONFIG_FILES:
+        source = os.path.join(toplevel, name)
+        path = os.path.join(worktree, name)
+        if os.path.isfile(source) and not os.path.lexists(path):
+            os.symlink(source, path)
+
+
+def add_build_worktrees(count):
+    """Create COUNT detached worktrees in a temporary directory.
+
+    Returns (temp_dir, worktree_paths).
+    """
+    temp_dir = tempfile.mkdtemp(prefix="firmware_size_history-")
+    worktrees = []
+    for i in range(count):
+        path = os.path.join(temp_dir, f"wt{i}")
+        run(["git", "worktree", "add", "--detach", path, "HEAD"])
+        worktrees.append(path)
+    return temp_dir, worktrees
+
+
+def remove_build_worktrees(temp_dir, worktrees, submodules):
+    """Remove worktrees made by add_build_worktrees, leaving shared submodules alone."""
+    for path in worktrees:
+        for sub in submodules:
+            link = os.path.join(path, sub)
+            if os.path.islink(link):
+                os.unlink(link)
+        run(["git", "worktree", "remove", "--force", path], check=False)
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def build_firmware(env, cwd=None):
+    """Run pio build; return (exit code, flash used bytes or None).
+
+    Output is scanned line by line as it streams in rather than collected,
+    and is read to the end so pio never blocks on a full pipe.
+    """
+    used = None
+    with subprocess.Popen(
         ["pio", "run", "-e", env],
-        capture_output=True, text=True, check=False
-    )
-    return result.returncode, result.stdout + "\n" + result.stderr
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, cwd=cwd
+    ) as proc:
+        for line in proc.stdout:
+            if used is None:
+                used = parse_flash_used(line)
+    return proc.returncode, used
 
 
 def parse_flash_used(output):
-    """Extract used-bytes integer from PlatformIO output, or None."""
+    """Extract used-bytes integer from a line of PlatformIO output, or None."""
     m = FLASH_RE.search(output)
     if m:
         return int(m.group(1))
@@ -151,8 +223,7 @@ def format_table(rows):
 
 def build_commits_from_range(start, end):
     """Validate a range and return (all_commits, description) for the build loop."""
-    start_sha, start_title = resolve_ref(start)
-    resolve_ref(end)
+    (start_sha, start_title), _end = resolve_refs([start, end])
 
     commits = git_commit_list(start, end)
     if not commits:
@@ -164,13 +235,83 @@ def build_commits_from_range(start, end):
     return all_commits, desc
 
 
+def resolve_refs(refs):
+    """Resolve git refs to [(full_sha, title), ...] with two git calls in total.
+
+    Falls back to resolve_ref one by one when the batch cannot be resolved,
+    so a bad ref is still reported by name.
+    """
+    r = run(["git", "rev-parse"] + [f"{ref}^{{commit}}" for ref in refs], check=False)
+    shas = r.stdout.split()
+    if r.returncode != 0 or len(shas) != len(refs):
+        return [resolve_ref(ref) for ref in refs]
+
+    # --no-walk lists each commit once, so titles are looked up by SHA
+    log = run(["git", "log", "--no-walk=unsorted", "--format=%H%x09%s"] + shas).stdout
+    titles = dict(line.split("\t", 1) for line in log.splitlines() if line)
+    return [(sha, titles[sha]) for sha in shas]
+
+
 def build_commits_from_list(refs):
     """Resolve each ref and return (all_commits, description) for the build loop."""
-    all_commits = [resolve_ref(ref) for ref in refs]
+    all_commits = resolve_refs(refs)
     desc = f"{len(all_commits)} commit{'s' if len(all_commits) != 1 else ''}"
     return all_commits, desc
 
 
+def build_flash_used(env, cwd=None):
+    """Build the checked-out tree; return (used_bytes or None, status message)."""
+    rc, used = build_firmware(env, cwd)
+    if rc != 0:
+        return None, f"BUILD FAILED (exit {rc}) -- skipping"
+
+    if used is None:
+        return None, "Could not parse flash size from output -- skipping"
+
+    return used, f"Flash used: {used:,} bytes"
+
+
+def build_in_worktrees(commits, env, jobs, label):
+    """Build COMMITS concurrently, each checked out in a free temporary worktree.
+
+    The main checkout is never touched, so nothing needs stashing or restoring,
+    and its own .pio build directory is left as it was.
+    Returns (sha, title, used) in commit order; an interrupted run returns the
+    builds reported before the interrupt.
+    """
+    toplevel = git_toplevel()
+    submodules = git_submodule_paths(toplevel)
+    temp_dir, worktrees = add_build_worktrees(min(jobs, len(commits)))
+    free = queue.Queue()
+    for path in worktrees:
+        free.put(path)
+
+    def build_one(sha):
+        worktree = free.get()
+        try:
+            run(["git", "-C", worktree, "checkout", "--detach", sha])
+            link_submodules(worktree, toplevel, submodules)
+            return build_flash_used(env, worktree)
+        finally:
+            free.put(worktree)
+
+    results = []
+    pool = ThreadPoolExecutor(max_workers=len(worktrees))
+    try:
+        futures = [pool.submit(build_one, sha) for sha, _title in commits]
+        for i, ((sha, title), future) in enumerate(zip(commits, futures)):
+            used, message = future.result()
+            print(f"\n[{label(i)}] {sha[:10]} {title}\n  {message}", file=sys.stderr)
+            results.append((sha, title, used))
+    except KeyboardInterrupt:
+        print("\n[info] Interrupted -- writing partial results.", file=sys.stderr)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        print("\n[info] Removing build worktrees...", file=sys.stderr)
+        remove_build_worktrees(temp_dir, worktrees, submodules)
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Measure firmware flash size across git commits.",
@@ -195,10 +336,23 @@ def main():
         "--csv", nargs="?", const="-", default=None, metavar="FILE",
         help="Output as CSV (default: stdout, or specify FILE)",
     )
+    parser.add_argument(
+        "--jobs", type=int, default=1, metavar="N",
+        help="Commits to build concurrently, one temporary worktree each (default: 1)",
+    )
+    parser.add_argument(
+        "--build-cache", metavar="DIR",
+        help="PlatformIO build cache directory shared by every build (default: none)",
+    )
     args = parser.parse_args()
-
-    # Validate refs before touching the working tree so a bad ref never
-    # leaves uncommitted changes stranded in the stash.
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.build_cache:
+        # Inherited by every pio run; the cache is keyed by compiler command
+        # and source contents, so commits reuse each other's unchanged objects
+        os.environ["PLATFORMIO_BUILD_CACHE_DIR"] = os.path.abspath(args.build_cache)
+
+    # Validate refs before creating any worktrees
     if args.range:
         all_commits, desc = build_commits_from_range(args.range[0], args.range[1])
         is_range = True
@@ -206,55 +360,13 @@ def main():
         all_commits, desc = build_commits_from_list(args.commits)
         is_range = False
 
-    original_ref = git_current_ref()
-    print(f"[info] Will restore to '{original_ref}' when finished.", file=sys.stderr)
-
-    stash_needed = False
-    status = run(["git", "status", "--porcelain"]).stdout.strip()
-    if status:
-        print("[info] Stashing uncommitted changes...", file=sys.stderr)
-        run(["git", "stash", "push", "-m", "firmware_size_history auto-stash"])
-        stash_needed = True
+    def label(i):
+        if is_range:
+            return "baseline" if i == 0 else f"{i}/{len(all_commits) - 1}"
+        return f"{i + 1}/{len(all_commits)}"
 
-    print(f"[info] Building {desc}...", file=sys.stderr)
-
-    results = []
-    try:
-        for i, (sha, title) in enumerate(all_commits):
-            short = sha[:10]
-            if is_range:
-                label = "baseline" if i == 0 else f"{i}/{len(all_commits) - 1}"
-            else:
-                label = f"{i + 1}/{len(all_commits)}"
-            print(f"\n[{label}] {short} {title}", file=sys.stderr)
-
-            git_checkout(sha)
-
-            print(f"  Building (env: {args.env})...", file=sys.stderr)
-            rc, output = build_firmware(args.env)
-
-            if rc != 0:
-                print(f"  BUILD FAILED (exit {rc}) -- skipping", file=sys.stderr)
-                results.append((sha, title, None))
-                continue
-
-            used = parse_flash_used(output)
-            if used is None:
-                print("  Could not parse flash size from output -- skipping", file=sys.stderr)
-                results.append((sha, title, None))
-                continue
-
-            print(f"  Flash used: {used:,} bytes", file=sys.stderr)
-            results.append((sha, title, used))
-
-    except KeyboardInterrupt:
-        print("\n[info] Interrupted -- writing partial results.", file=sys.stderr)
-    finally:
-        print(f"\n[info] Restoring '{original_ref}'...", file=sys.stderr)
-        run(["git", "checkout", original_ref], check=False)
-        if stash_needed:
-            print("[info] Restoring stashed changes...", file=sys.stderr)
-            run(["git", "stash", "pop"], check=False)
+    print(f"[info] Building {desc}, {args.jobs} at a time (env: {args.env})...", file=sys.stderr)
+    results = build_in_worktrees(all_commits, args.env, args.jobs, label)
 
     # Build result rows with deltas
     rows = []
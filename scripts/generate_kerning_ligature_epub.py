@@ -135,11 +135,13 @@ Also includes:
   Punctuation adjacency (T., V., W., Y.)
 """
 
+import functools
 import io
 import os
 import zipfile
 import uuid
 from datetime import datetime
+from typing import BinaryIO
 
 try:
     from PIL import Image, ImageDraw, ImageFont
@@ -155,8 +157,12 @@ _BOOKERLY_FONT = os.path.join(
 )
 
 
+@functools.lru_cache(maxsize=32)
 def _get_font(size=20):
-    """Get the Bookerly font at the requested size, with system fallbacks."""
+    """Get the Bookerly font at the requested size, with system fallbacks.
+
+    Cached per size, so the TTF is opened and parsed once for each size used.
+    """
     paths = [_BOOKERLY_FONT]
     for path in paths:
         try:
@@ -167,14 +173,18 @@ def _get_font(size=20):
 
 
 def _draw_text_centered(draw, y, text, font, fill, width):
-    bbox = draw.textbbox((0, 0), text, font=font)
-    text_width = bbox[2] - bbox[0]
+    text_width = int(font.getlength(text))
     x = (width - text_width) // 2
     draw.text((x, y), text, font=font, fill=fill)
 
 
+@functools.lru_cache(maxsize=None)
 def create_cover_image():
-    """Generate a cover image matching the original layout and return JPEG bytes."""
+    """Generate a cover image matching the original layout and return JPEG bytes.
+
+    The cover is fully deterministic, so it is rendered and encoded once per
+    process however many times build_epub runs.
+    """
     width, height = 536, 800
     bg_color = (30, 42, 58)
     text_color = (225, 220, 205)
@@ -207,20 +217,28 @@ def create_cover_image():
     img.save(buf, "JPEG", quality=90)
     return buf.getvalue()
 
-BOOK_UUID = str(uuid.uuid4())
 TITLE = "Kerning &amp; Ligature Edge Cases"
 AUTHOR = "Crosspoint Test Fixtures"
-DATE = datetime.now().strftime("%Y-%m-%d")
 
 # ── XHTML content pages ──────────────────────────────────────────────
 
-CHAPTER_1 = """\
+_XHTML_SHELL = """\
 <?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE html>
 <html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 1 – The Typographer's Affliction</title>
+<head><title>{title}</title>
 <link rel="stylesheet" type="text/css" href="style.css"/></head>
 <body>
+{body}</body>
+</html>
+"""
+
+
+def _chapter_xhtml(title, body):
+    return _XHTML_SHELL.format(title=title, body=body)
+
+
+CHAPTER_1 = _chapter_xhtml("Chapter 1 – The Typographer's Affliction", """\
 <h1>Chapter 1<br/>The Typographer&#x2019;s Affliction</h1>
 
 <p>AVERY WATT always wanted to be a typographer. Years of careful study
@@ -260,17 +278,9 @@ typesetting had left Avery with impeccable standards and a permanent
 squint. He could spot a miskerned &#x2018;AT&#x2019; pair from across the room.
 &#x201C;Fetch the reference sheets,&#x201D; he told Vera. &#x201C;And coffee. Strong
 coffee.&#x201D;</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_2 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 2 – Ligatures in the Afflicted Offices</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_2 = _chapter_xhtml("Chapter 2 – Ligatures in the Afflicted Offices", """\
 <h1>Chapter 2<br/>Ligatures in the Afflicted Offices</h1>
 
 <p>The first difficulty arose with ligatures. Avery was fiercely attached
@@ -309,17 +319,9 @@ instructed.</i> Mrs. Thornton-Foxwell specifically requested them.&#x201D;</p>
 the h into a graceful Th, the texture of every page improves. Set
 <i>The thrush sat on the thatched roof of the theatre, thinking.</i>
 There &#x2014; Th six times in one sentence.&#x201D;</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_3 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 3 – The Proof of the Pudding</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_3 = _chapter_xhtml("Chapter 3 – The Proof of the Pudding", """\
 <h1>Chapter 3<br/>The Proof of the Pudding</h1>
 
 <p>Two weeks later, the revised proofs arrived. Avery carried them to the
@@ -365,17 +367,9 @@ versals.</i></p></blockquote>
 in <i>Venetian</i>, the Ye in <i>Years</i>, the Ty in <i>Tywyn</i>, the Tu in
 <i>Tuscan</i>, the Lo in <i>Lombardic</i> &#x2014; every pair sat comfortably on the
 baseline, with not a hair&#x2019;s breadth of excess space.</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_4 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 4 – Punctuation and Numerals</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_4 = _chapter_xhtml("Chapter 4 – Punctuation and Numerals", """\
 <h1>Chapter 4<br/>Punctuation and Numerals</h1>
 
 <p>&#x201C;Now for the tricky part,&#x201D; Avery said, reaching for a loupe. Kerning
@@ -418,17 +412,9 @@ and the bold. And after that &#x2014; the small capitals.&#x201D;</p>
 <p>Vera groaned. &#x201C;You&#x2019;re a perfectionist, Avery Watt.&#x201D;</p>
 
 <p>&#x201C;Naturally,&#x201D; he replied. &#x201C;That&#x2019;s what they pay us for.&#x201D;</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_5 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 5 – A Glossary of Troublesome Pairs</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_5 = _chapter_xhtml("Chapter 5 – A Glossary of Troublesome Pairs", """\
 <h1>Chapter 5<br/>A Glossary of Troublesome Pairs</h1>
 
 <p>As a final flourish, Avery drafted an appendix for the volume: a
@@ -502,17 +488,9 @@ Thought, Thousand, Thrive, Throne, Thatch.</p>
 <p>&#x201C;There,&#x201D; Avery said, setting down his pencil. &#x201C;If a typesetter can
 handle every word in that glossary without a single misfit, miskerned,
 or malformed glyph, they deserve their weight in Garamond.&#x201D;</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_6 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 6 &#x2013; Western European Accents</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_6 = _chapter_xhtml("Chapter 6 &#x2013; Western European Accents", """\
 <h1>Chapter 6<br/>Western European Accents</h1>
 
 <p>Before the calligraphy volume was even bound, Mrs. Thornton-Foxwell
@@ -650,17 +628,9 @@ at U+2026, not three periods &#x2014; needs its own kerning against adjacent
 quotation marks, letters, and spaces. The pair &#x2026;&#x201D; and
 &#x2026;&#x2019; are especially important: the ellipsis must not crash
 into the closing quote.&#x201D;</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_7 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 7 &#x2013; Beyond the Western Alphabet</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_7 = _chapter_xhtml("Chapter 7 &#x2013; Beyond the Western Alphabet", """\
 <h1>Chapter 7<br/>Beyond the Western Alphabet</h1>
 
 <p>Just when Avery thought the project was finished, Lydia Thornton-Foxwell
@@ -811,17 +781,9 @@ range.&#x201D;</p>
 
 <p>Vera looked at the list and sighed. &#x201C;I&#x2019;ll put the kettle on.
 This is going to be a long night.&#x201D;</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_8 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 8 &#x2013; The Cyrillic Challenge</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_8 = _chapter_xhtml("Chapter 8 &#x2013; The Cyrillic Challenge", """\
 <h1>Chapter 8<br/>The Cyrillic Challenge</h1>
 
 <p>The companion volume was barely off the press when Mrs. Thornton-Foxwell
@@ -995,17 +957,9 @@ paragraph looks like it&#x2019;s falling apart.&#x201D;</p>
 and smiled wearily. &#x201C;At least there are no Cyrillic ligatures.&#x201D;</p>
 
 <p>&#x201C;Yet,&#x201D; said Avery.</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_9 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 9 &#x2013; Latin Extended-B</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_9 = _chapter_xhtml("Chapter 9 &#x2013; Latin Extended-B", """\
 <h1>Chapter 9<br/>Latin Extended-B</h1>
 
 <p>Months passed. Avery had just begun to relax when the telephone rang
@@ -1132,17 +1086,9 @@ needs rechecking.&#x201D;</p>
 <b>T&#x1D6;</b> &#x2014; As in n&#x1D6; (Pinyin: female).<br/>
 <b>&#x191;a</b> &#x2014; As in &#x191;arin (Hausa).<br/>
 <b>&#x191;o</b> &#x2014; As in &#x191;oto (Hausa).</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_10 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 10 &#x2013; Greek &amp; Coptic</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_10 = _chapter_xhtml("Chapter 10 &#x2013; Greek &amp; Coptic", """\
 <h1>Chapter 10<br/>Greek &amp; Coptic</h1>
 
 <p>The final challenge arrived not by telephone but by post: a handwritten
@@ -1307,17 +1253,9 @@ they have earned my respect.&#x201D;</p>
 one last time?&#x201D;</p>
 
 <p>&#x201C;Please,&#x201D; said Avery. &#x201C;And make it strong.&#x201D;</p>
-</body>
-</html>
-"""
+""")
 
-CHAPTER_11 = """\
-<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">
-<head><title>Chapter 11 &#x2013; Combining Marks</title>
-<link rel="stylesheet" type="text/css" href="style.css"/></head>
-<body>
+CHAPTER_11 = _chapter_xhtml("Chapter 11 &#x2013; Combining Marks", """\
 <h1>Chapter 11<br/>Combining Marks</h1>
 
 <p>Avery had thought the project was finally complete when Vera placed
@@ -1543,9 +1481,12 @@ and now combining marks. If the renderer survives all of that, it can
 handle anything a publisher throws at it.&#x201D;</p>
 
 <p>He set down his pencil and reached for his coffee. It was cold.</p>
-</body>
-</html>
-"""
+""")
+
+CHAPTERS = (
+    CHAPTER_1, CHAPTER_2, CHAPTER_3, CHAPTER_4, CHAPTER_5, CHAPTER_6,
+    CHAPTER_7, CHAPTER_8, CHAPTER_9, CHAPTER_10, CHAPTER_11,
+)
 
 COVER_XHTML = """\
 <?xml version="1.0" encoding="UTF-8"?>
@@ -1601,16 +1542,16 @@ CONTAINER_XML = """\
 </container>
 """
 
-CONTENT_OPF = f"""\
+CONTENT_OPF = """\
 <?xml version="1.0" encoding="UTF-8"?>
 <package xmlns="http://www.idpf.org/2007/opf" unique-identifier="BookId" version="3.0">
   <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
-    <dc:identifier id="BookId">urn:uuid:{BOOK_UUID}</dc:identifier>
-    <dc:title>{TITLE}</dc:title>
-    <dc:creator>{AUTHOR}</dc:creator>
+    <dc:identifier id="BookId">urn:uuid:{book_uuid}</dc:identifier>
+    <dc:title>{title}</dc:title>
+    <dc:creator>{author}</dc:creator>
     <dc:language>en</dc:language>
-    <dc:date>{DATE}</dc:date>
-    <meta property="dcterms:modified">{DATE}T00:00:00Z</meta>
+    <dc:date>{date}</dc:date>
+    <meta property="dcterms:modified">{date}T00:00:00Z</meta>
     <meta name="cover" content="cover-image"/>
   </metadata>
   <manifest>
@@ -1676,34 +1617,47 @@ TOC_XHTML = """\
 </html>
 """
 
+# The fixed text entries are encoded once at import rather than by every
+# writestr call.
+_CONTAINER_ENTRY = ("META-INF/container.xml", CONTAINER_XML.encode("utf-8"))
+_TEXT_ENTRIES = tuple(
+    (name, text.encode("utf-8"))
+    for name, text in [
+        ("OEBPS/toc.xhtml", TOC_XHTML),
+        ("OEBPS/style.css", STYLESHEET),
+        ("OEBPS/cover.xhtml", COVER_XHTML),
+        *((f"OEBPS/chapter{number}.xhtml", chapter)
+          for number, chapter in enumerate(CHAPTERS, start=1)),
+    ]
+)
 
-def build_epub(output_path: str):
-    cover_data = create_cover_image()
 
-    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+def build_epub(output: "str | os.PathLike | BinaryIO"):
+    """Write the EPUB to a path, or to an open binary file such as BytesIO."""
+    cover_data = create_cover_image()
+    content_opf = CONTENT_OPF.format(
+        book_uuid=uuid.uuid4(),
+        title=TITLE,
+        author=AUTHOR,
+        date=datetime.now().strftime("%Y-%m-%d"),
+    )
+
+    entries = [
+        _CONTAINER_ENTRY,
+        ("OEBPS/content.opf", content_opf.encode("utf-8")),
+        ("OEBPS/cover.jpg", cover_data),
+        *_TEXT_ENTRIES,
+    ]
+
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
         zf.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
-        zf.writestr("META-INF/container.xml", CONTAINER_XML)
-        zf.writestr("OEBPS/content.opf", CONTENT_OPF)
-        zf.writestr("OEBPS/toc.xhtml", TOC_XHTML)
-        zf.writestr("OEBPS/style.css", STYLESHEET)
-        zf.writestr("OEBPS/cover.jpg", cover_data)
-        zf.writestr("OEBPS/cover.xhtml", COVER_XHTML)
-        zf.writestr("OEBPS/chapter1.xhtml", CHAPTER_1)
-        zf.writestr("OEBPS/chapter2.xhtml", CHAPTER_2)
-        zf.writestr("OEBPS/chapter3.xhtml", CHAPTER_3)
-        zf.writestr("OEBPS/chapter4.xhtml", CHAPTER_4)
-        zf.writestr("OEBPS/chapter5.xhtml", CHAPTER_5)
-        zf.writestr("OEBPS/chapter6.xhtml", CHAPTER_6)
-        zf.writestr("OEBPS/chapter7.xhtml", CHAPTER_7)
-        zf.writestr("OEBPS/chapter8.xhtml", CHAPTER_8)
-        zf.writestr("OEBPS/chapter9.xhtml", CHAPTER_9)
-        zf.writestr("OEBPS/chapter10.xhtml", CHAPTER_10)
-        zf.writestr("OEBPS/chapter11.xhtml", CHAPTER_11)
-    print(f"EPUB written to {output_path}")
+        for name, data in entries:
+            zf.writestr(name, data)
+    if isinstance(output, (str, os.PathLike)):
+        print(f"EPUB written to {output}")
 
 
 if __name__ == "__main__":
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    out = os.path.join(project_root, "test", "epubs", "test_kerning_ligature.epub")
+    out = os.path.join(_PROJECT_ROOT, "test", "epubs", "test_kerning_ligature.epub")
     os.makedirs(os.path.dirname(out), exist_ok=True)
     build_epub(out)
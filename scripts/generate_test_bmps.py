@@ -32,6 +32,9 @@ HEIGHT = 800
 # The 4 e-ink gray levels (luminance values)
 GRAY_LEVELS = [0, 85, 170, 255]
 
+# bytes.translate tables that shift every byte left by 1-7 bits
+SHIFT_TABLES = {shift: bytes((v << shift) & 0xFF for v in range(256)) for shift in range(1, 8)}
+
 
 def write_bmp_file_header(f, pixel_data_offset, file_size):
     f.write(b'BM')
@@ -134,6 +137,34 @@ def get_test_pattern_lum(x, y, width, height):
         return ((x + y) * 255 // (width + height))
 
 
+def pattern_rows(pixel, width, height):
+    """Yield every row of a test pattern as bytes, one value per pixel.
+
+    pixel is get_test_pattern_index or get_test_pattern_lum.
+    """
+    for y in range(height):
+        yield bytes(pixel(x, y, width, height) for x in range(width))
+
+
+def pack_row(values, bpp):
+    """Pack one 0..2**bpp-1 value per byte into MSB-first bpp-bit pixels.
+
+    Each pixel position within a byte is a strided slice of the row; shifted
+    into place by a translate table, the slices are disjoint bit fields, so
+    OR-ing them as big integers assembles the whole packed row at once.
+    """
+    per_byte = 8 // bpp
+    values = bytes(values) + bytes(-len(values) % per_byte)
+    packed = 0
+    for i in range(per_byte):
+        shift = 8 - bpp * (i + 1)
+        lane = values[i::per_byte]
+        if shift:
+            lane = lane.translate(SHIFT_TABLES[shift])
+        packed |= int.from_bytes(lane, 'big')
+    return packed.to_bytes(len(values) // per_byte, 'big')
+
+
 def generate_1bit(path):
     """1-bit BMP: checkerboard pattern."""
     bpp = 1
@@ -148,14 +179,16 @@ def generate_1bit(path):
         write_bmp_dib_header(f, WIDTH, HEIGHT, bpp, len(palette))
         write_palette(f, palette)
 
-        for y in range(HEIGHT):
+        # 16x16 checkerboard: every row is one of two phases, so pack both once
+        phase_rows = []
+        for phase in range(2):
             row = bytearray(row_bytes)
             for x in range(WIDTH):
-                # 16x16 checkerboard
-                val = ((x // 16) + (y // 16)) % 2
-                if val:
+                if ((x // 16) + phase) % 2:
                     row[x >> 3] |= (0x80 >> (x & 7))
-            f.write(row)
+            phase_rows.append(row)
+
+        f.write(b''.join(phase_rows[(y // 16) % 2] for y in range(HEIGHT)))
 
     print(f"  Created: {path} ({bpp}-bit, {len(palette)} colors)")
 
@@ -174,14 +207,14 @@ def generate_2bit(path):
         write_bmp_dib_header(f, WIDTH, HEIGHT, bpp, len(palette))
         write_palette(f, palette)
 
-        for y in range(HEIGHT):
+        # Assemble the whole pixel array and hand it to the file in one write
+        pixels = bytearray()
+        for indices in pattern_rows(get_test_pattern_index, WIDTH, HEIGHT):
             row = bytearray(row_bytes)
-            for x in range(WIDTH):
-                idx = get_test_pattern_index(x, y, WIDTH, HEIGHT)
-                byte_pos = x >> 2
-                bit_shift = 6 - ((x & 3) * 2)
-                row[byte_pos] |= (idx << bit_shift)
-            f.write(row)
+            packed = pack_row(indices, bpp)
+            row[:len(packed)] = packed
+            pixels += row
+        f.write(pixels)
 
     print(f"  Created: {path} ({bpp}-bit, {len(palette)} colors)")
 
@@ -200,16 +233,13 @@ def generate_4bit(path):
         write_bmp_dib_header(f, WIDTH, HEIGHT, bpp, len(palette))
         write_palette(f, palette)
 
-        for y in range(HEIGHT):
+        pixels = bytearray()
+        for indices in pattern_rows(get_test_pattern_index, WIDTH, HEIGHT):
             row = bytearray(row_bytes)
-            for x in range(WIDTH):
-                idx = get_test_pattern_index(x, y, WIDTH, HEIGHT)
-                byte_pos = x >> 1
-                if x & 1:
-                    row[byte_pos] |= idx
-                else:
-                    row[byte_pos] |= (idx << 4)
-            f.write(row)
+            packed = pack_row(indices, bpp)
+            row[:len(packed)] = packed
+            pixels += row
+        f.write(pixels)
 
     print(f"  Created: {path} ({bpp}-bit, {len(palette)} colors)")
 
@@ -228,11 +258,12 @@ def generate_8bit_4colors(path):
         write_bmp_dib_header(f, WIDTH, HEIGHT, bpp, len(palette))
         write_palette(f, palette)
 
-        for y in range(HEIGHT):
+        pixels = bytearray()
+        for indices in pattern_rows(get_test_pattern_index, WIDTH, HEIGHT):
             row = bytearray(row_bytes)
-            for x in range(WIDTH):
-                row[x] = get_test_pattern_index(x, y, WIDTH, HEIGHT)
-            f.write(row)
+            row[:WIDTH] = indices
+            pixels += row
+        f.write(pixels)
 
     print(f"  Created: {path} ({bpp}-bit, {len(palette)} colors)")
 
@@ -251,11 +282,12 @@ def generate_8bit_256colors(path):
         write_bmp_dib_header(f, WIDTH, HEIGHT, bpp, len(palette))
         write_palette(f, palette)
 
-        for y in range(HEIGHT):
+        pixels = bytearray()
+        for lums in pattern_rows(get_test_pattern_lum, WIDTH, HEIGHT):
             row = bytearray(row_bytes)
-            for x in range(WIDTH):
-                row[x] = get_test_pattern_lum(x, y, WIDTH, HEIGHT)
-            f.write(row)
+            row[:WIDTH] = lums
+            pixels += row
+        f.write(pixels)
 
     print(f"  Created: {path} ({bpp}-bit, {len(palette)} colors)")
 
@@ -271,15 +303,14 @@ def generate_24bit(path):
         write_bmp_file_header(f, pixel_offset, file_size)
         write_bmp_dib_header(f, WIDTH, HEIGHT, bpp, 0)
 
-        for y in range(HEIGHT):
+        pixels = bytearray()
+        for lums in pattern_rows(get_test_pattern_lum, WIDTH, HEIGHT):
             row = bytearray(row_bytes)
-            for x in range(WIDTH):
-                gray = get_test_pattern_lum(x, y, WIDTH, HEIGHT)
-                offset = x * 3
-                row[offset] = gray      # B
-                row[offset + 1] = gray  # G
-                row[offset + 2] = gray  # R
-            f.write(row)
+            row[0:WIDTH * 3:3] = lums  # B
+            row[1:WIDTH * 3:3] = lums  # G
+            row[2:WIDTH * 3:3] = lums  # R
+            pixels += row
+        f.write(pixels)
 
     print(f"  Created: {path} ({bpp}-bit)")
 